@@ -0,0 +1,77 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 00:00:00
+
+Tables were previously created with Base.metadata.create_all, so each one
+is only created when missing; existing deployments adopt this revision
+without changes.
+"""
+from alembic import context, op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    existing = set() if context.is_offline_mode() else set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "ideas" not in existing:
+        op.create_table(
+            "ideas",
+            sa.Column("id", sa.String(), primary_key=True),
+            sa.Column("title", sa.String(), nullable=False),
+            sa.Column("description", sa.Text(), nullable=False),
+            sa.Column("category", sa.String(), nullable=True),
+            sa.Column("tags", postgresql.ARRAY(sa.String()).with_variant(sa.JSON(), "sqlite"), nullable=True),
+            sa.Column("user_session", sa.String(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+        )
+
+    if "comments" not in existing:
+        op.create_table(
+            "comments",
+            sa.Column("id", sa.String(), primary_key=True),
+            sa.Column("idea_id", sa.String(), sa.ForeignKey("ideas.id"), nullable=False),
+            sa.Column("content", sa.Text(), nullable=False),
+            sa.Column("user_session", sa.String(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+        )
+
+    if "prompts" not in existing:
+        op.create_table(
+            "prompts",
+            sa.Column("id", sa.String(), primary_key=True),
+            sa.Column("project_idea", sa.Text(), nullable=False),
+            sa.Column("detected_stack", sa.Text(), nullable=False),
+            sa.Column("recommended_tool", sa.String(), nullable=False),
+            sa.Column("dev_structure", sa.Text(), nullable=False),
+            sa.Column("infra_tools", sa.Text(), nullable=False),
+            sa.Column("generated_prompt", sa.Text(), nullable=False),
+            sa.Column("final_prompt", sa.Text(), nullable=False),
+            sa.Column("is_finalized", sa.String(), nullable=True),
+            sa.Column("user_session", sa.String(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+        )
+
+    if "analysis_cache" not in existing:
+        op.create_table(
+            "analysis_cache",
+            sa.Column("key", sa.String(64), primary_key=True),
+            sa.Column("payload", sa.Text(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("expires_at", sa.DateTime(), nullable=False),
+        )
+
+def downgrade() -> None:
+    op.drop_table("analysis_cache")
+    op.drop_table("prompts")
+    op.drop_table("comments")
+    op.drop_table("ideas")
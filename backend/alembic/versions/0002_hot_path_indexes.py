@@ -0,0 +1,49 @@
+"""indexes for hot query paths
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00
+
+Covers the session-filtered keyset listings, comment lookups by idea, the
+tag containment filter and the analysis cache trim. On Postgres the
+indexes are built CONCURRENTLY so the migration does not lock writers out
+of large tables.
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_ideas_user_session_created_at", "ideas", ["user_session", "created_at", "id"]),
+    ("ix_ideas_created_at_id", "ideas", ["created_at", "id"]),
+    ("ix_comments_idea_id_created_at", "comments", ["idea_id", "created_at"]),
+    ("ix_prompts_user_session_created_at", "prompts", ["user_session", "created_at", "id"]),
+    ("ix_prompts_created_at_id", "prompts", ["created_at", "id"]),
+    ("ix_analysis_cache_created_at", "analysis_cache", ["created_at"]),
+]
+
+def upgrade() -> None:
+    is_postgres = op.get_bind().dialect.name == "postgresql"
+
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True, postgresql_concurrently=True)
+
+        if is_postgres:
+            op.create_index(
+                "ix_ideas_tags", "ideas", ["tags"],
+                if_not_exists=True, postgresql_using="gin", postgresql_concurrently=True
+            )
+
+def downgrade() -> None:
+    is_postgres = op.get_bind().dialect.name == "postgresql"
+
+    with op.get_context().autocommit_block():
+        if is_postgres:
+            op.drop_index("ix_ideas_tags", table_name="ideas", if_exists=True, postgresql_concurrently=True)
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,45 @@
+"""store prompt analysis fields as JSONB
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:00
+
+detected_stack, dev_structure and infra_tools held JSON documents in Text
+columns. On Postgres they are converted in place to JSONB (existing rows
+are cast, so no separate backfill pass is needed) and detected_stack gets
+a jsonb_path_ops GIN index for containment queries. SQLite keeps JSON as
+text, so nothing changes there.
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+COLUMNS = ("detected_stack", "dev_structure", "infra_tools")
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    for column in COLUMNS:
+        op.execute(f"ALTER TABLE prompts ALTER COLUMN {column} TYPE JSONB USING {column}::jsonb")
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_prompts_detected_stack", "prompts", ["detected_stack"],
+            if_not_exists=True, postgresql_using="gin",
+            postgresql_ops={"detected_stack": "jsonb_path_ops"}, postgresql_concurrently=True
+        )
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_prompts_detected_stack", table_name="prompts", if_exists=True, postgresql_concurrently=True)
+
+    for column in COLUMNS:
+        op.execute(f"ALTER TABLE prompts ALTER COLUMN {column} TYPE TEXT USING {column}::text")
@@ -0,0 +1,56 @@
+"""full-text search vectors
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 00:00:00
+
+Adds generated tsvector columns over the searchable text of ideas,
+comments and prompts, each with a GIN index. Postgres keeps the vectors
+up to date on every write, so no triggers are needed. Adding a stored
+generated column rewrites the table once; the indexes are then built
+CONCURRENTLY. SQLite has no tsvector, so search there uses the in-process
+index and this revision does nothing.
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+SEARCH_VECTORS = {
+    "ideas": "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+             "setweight(to_tsvector('simple', coalesce(description, '')), 'B')",
+    "comments": "to_tsvector('simple', coalesce(content, ''))",
+    "prompts": "setweight(to_tsvector('simple', coalesce(project_idea, '')), 'A') || "
+               "setweight(to_tsvector('simple', coalesce(final_prompt, '')), 'B')",
+}
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    for table, expression in SEARCH_VECTORS.items():
+        op.execute(
+            f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+            f"GENERATED ALWAYS AS ({expression}) STORED"
+        )
+
+    with op.get_context().autocommit_block():
+        for table in SEARCH_VECTORS:
+            op.create_index(
+                f"ix_{table}_search", table, ["search_vector"],
+                if_not_exists=True, postgresql_using="gin", postgresql_concurrently=True
+            )
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    with op.get_context().autocommit_block():
+        for table in SEARCH_VECTORS:
+            op.drop_index(f"ix_{table}_search", table_name=table, if_exists=True, postgresql_concurrently=True)
+
+    for table in SEARCH_VECTORS:
+        op.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector")
@@ -1,9 +1,10 @@
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import prompts, analyze, ideas
+from app.api.v1.endpoints import prompts, analyze, ideas, search
 
 api_router = APIRouter()
 
 api_router.include_router(prompts.router, prefix="/prompts", tags=["prompts"])
 api_router.include_router(analyze.router, prefix="/analyze", tags=["analyze"])
-api_router.include_router(ideas.router, prefix="/ideas", tags=["ideas"]) 
\ No newline at end of file
+api_router.include_router(ideas.router, prefix="/ideas", tags=["ideas"])
+api_router.include_router(search.router, prefix="/search", tags=["search"]) 
\ No newline at end of file
@@ -1,20 +1,50 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
-from app.services.openai_service import openai_service
+import asyncio
+import json
+import time
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import List, Dict, Any, Optional, Tuple
+from app.core.concurrency import cancel_on_disconnect
+from app.core.config import settings
+from app.core.metrics import ANALYSIS_RESULTS
+from app.core.responses import json_response
+from app.services.openai_service import get_openai_service
+from app.services.analysis_cache import analysis_cache
+from app.services.rule_engine import rule_engine
+from app.services.similarity import similarity_index
+from app.services.text_analysis import analyze, text_analyzer
 
 router = APIRouter()
 
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no"
+}
+
+# Set when the answer reuses the analysis of a near-duplicate idea
+SIMILARITY_HEADER = "X-Analysis-Similarity"
+
 # Pydantic models for request/response
 class AnalyzeRequest(BaseModel):
     text: str
     analysis_type: str = "general"  # general, sentiment, keywords, etc.
     options: Optional[Dict[str, Any]] = {}
 
+class AnalyzeBatchRequest(BaseModel):
+    texts: List[str]
+    analysis_type: str = "general"
+
 class ProjectAnalyzeRequest(BaseModel):
     project_idea: str
     language: str = "en"
     custom_data: Optional[Dict[str, Any]] = None
+    user_session: Optional[str] = None  # used for fair scheduling of upstream calls
+
+class ProjectBatchRequest(BaseModel):
+    items: List[ProjectAnalyzeRequest]
+    concurrency: Optional[int] = Field(None, gt=0)  # defaults to BATCH_DEFAULT_CONCURRENCY, capped at BATCH_MAX_CONCURRENCY
+    item_timeout: Optional[float] = Field(None, gt=0)  # seconds, defaults to and capped at BATCH_ITEM_TIMEOUT
 
 class TechStack(BaseModel):
     frontend: List[str]
@@ -59,92 +89,221 @@ class AnalyzeResponse(BaseModel):
     confidence: Optional[float] = None
     metadata: Optional[Dict[str, Any]] = {}
 
+def _analysis_metadata(started: float) -> Dict[str, Any]:
+    return {
+        "processing_time": f"{time.perf_counter() - started:.6f}s",
+        "model_version": "1.0.0"
+    }
+
 @router.post("/", response_model=AnalyzeResponse)
 async def analyze_text(request: AnalyzeRequest):
     """Analyze text based on the specified analysis type"""
-    
-    # Mock analysis logic (replace with actual AI/ML models)
-    results = {}
-    
-    if request.analysis_type == "sentiment":
-        # Mock sentiment analysis
-        results = {
-            "sentiment": "positive",
-            "score": 0.8,
-            "emotions": {
-                "joy": 0.7,
-                "anger": 0.1,
-                "sadness": 0.1,
-                "fear": 0.1
-            }
-        }
-    elif request.analysis_type == "keywords":
-        # Mock keyword extraction
-        words = request.text.lower().split()
-        word_freq = {}
-        for word in words:
-            word_freq[word] = word_freq.get(word, 0) + 1
-        
-        results = {
-            "keywords": sorted(word_freq.items(), key=lambda x: x[1], reverse=True)[:5],
-            "total_words": len(words),
-            "unique_words": len(word_freq)
-        }
-    elif request.analysis_type == "readability":
-        # Mock readability analysis
-        sentences = request.text.split('.')
-        words = request.text.split()
-        
-        results = {
-            "readability_score": 7.5,
-            "grade_level": "7th-8th grade",
-            "sentence_count": len(sentences),
-            "word_count": len(words),
-            "avg_words_per_sentence": len(words) / max(len(sentences), 1)
-        }
-    else:
-        # General analysis
-        results = {
-            "character_count": len(request.text),
-            "word_count": len(request.text.split()),
-            "sentence_count": len(request.text.split('.')),
-            "paragraph_count": len(request.text.split('\n\n')),
-            "language": "detected_language"
-        }
+    started = time.perf_counter()
+    results = analyze(request.text, request.analysis_type)
     
     return AnalyzeResponse(
         text=request.text,
         analysis_type=request.analysis_type,
         results=results,
         confidence=0.85,
-        metadata={
-            "processing_time": "0.123s",
-            "model_version": "1.0.0"
-        }
+        metadata=_analysis_metadata(started)
     )
 
+@router.post("/batch")
+async def analyze_text_batch(request: AnalyzeBatchRequest):
+    """Analyze many texts with one analysis type
+    
+    Results come back in the order of `texts`, each shaped like the
+    `results` of `POST /analyze`. Large batches are spread over a process
+    pool so they do not stall other requests.
+    """
+    if len(request.texts) > settings.TEXT_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch exceeds the maximum of {settings.TEXT_BATCH_MAX_ITEMS} texts"
+        )
+    
+    started = time.perf_counter()
+    results = await text_analyzer.analyze_batch(request.texts, request.analysis_type)
+    return json_response({
+        "analysis_type": request.analysis_type,
+        "results": results,
+        "metadata": {"count": len(results), **_analysis_metadata(started)}
+    })
+
 @router.post("/project", response_model=ProjectAnalyzeResponse)
-async def analyze_project(request: ProjectAnalyzeRequest):
+async def analyze_project(request: ProjectAnalyzeRequest, http_request: Request, response: Response):
     """Analyze project idea and provide comprehensive recommendations"""
     
     # If custom_data is provided, generate prompt based on edited data
     if request.custom_data:
         return _generate_prompt_from_custom_data(request.project_idea, request.custom_data)
     
+    # Reuse the analysis of a near-duplicate idea instead of calling the model
+    similar = await _find_similar_analysis(request.project_idea, request.language)
+    if similar is not None:
+        score, reused = similar
+        response.headers[SIMILARITY_HEADER] = f"{score:.3f}"
+        return reused
+    
     # Check if OpenAI service is available
+    openai_service = get_openai_service()
     if not openai_service:
         raise HTTPException(
             status_code=503,
             detail="OpenAI service is not available. Please configure OPENAI_API_KEY in environment variables."
         )
     
-    try:
-        # Use OpenAI service for project analysis
-        analysis_result = await openai_service.analyze_project(
+    # Use OpenAI service for project analysis; the upstream call is aborted
+    # if the client goes away before it completes
+    analysis_result = await cancel_on_disconnect(
+        http_request,
+        openai_service.analyze_project(
             project_idea=request.project_idea,
-            language=request.language
+            language=request.language,
+            user_session=request.user_session
         )
+    )
+    
+    return _build_project_response(request.project_idea, analysis_result)
+
+@router.post("/project/stream")
+async def analyze_project_stream(request: ProjectAnalyzeRequest):
+    """Stream a project analysis as Server-Sent Events
+    
+    Emits `token` events with raw model output, a `section` event as soon as
+    each top-level field of the analysis is complete, and a final `done`
+    event carrying the full ProjectAnalyzeResponse. A `preview` event with
+    the rule-based offline analysis is sent first so clients can render a
+    recommendation while the model works. A reused analysis of a similar
+    idea is sent as sections and a `done` event with `similarity`.
+    """
+    
+    if request.custom_data:
+        response = _generate_prompt_from_custom_data(request.project_idea, request.custom_data)
+        
+        async def custom_events():
+            yield _sse_event("done", {"result": response.model_dump(), "cached": False, "fallback": False})
+        
+        return StreamingResponse(custom_events(), media_type="text/event-stream", headers=SSE_HEADERS)
+    
+    similar = await _find_similar_analysis(request.project_idea, request.language)
+    if similar is not None:
+        score, reused = similar
+        
+        async def similar_events():
+            result = reused.model_dump()
+            for name, value in result.items():
+                yield _sse_event("section", {"name": name, "data": value})
+            yield _sse_event("done", {"result": result, "cached": False, "fallback": False, "similarity": score})
         
+        return StreamingResponse(similar_events(), media_type="text/event-stream", headers=SSE_HEADERS)
+    
+    openai_service = get_openai_service()
+    if not openai_service:
+        raise HTTPException(
+            status_code=503,
+            detail="OpenAI service is not available. Please configure OPENAI_API_KEY in environment variables."
+        )
+    
+    async def events():
+        yield _sse_event("preview", {"result": _get_mock_analysis(request.project_idea).model_dump()})
+        
+        # Starlette cancels this generator when the client disconnects, which
+        # closes the upstream stream as well
+        async for event, data in openai_service.stream_analysis(
+            project_idea=request.project_idea,
+            language=request.language,
+            user_session=request.user_session
+        ):
+            if event == "done":
+                data["result"] = _build_project_response(request.project_idea, data["result"]).model_dump()
+            yield _sse_event(event, data)
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+@router.post("/project/batch")
+async def analyze_project_batch(request: ProjectBatchRequest):
+    """Analyze many project ideas with bounded concurrency
+    
+    Results are streamed as NDJSON in completion order, one line per input
+    item: `{"index", "status", "result" | "error"}` with status `ok`,
+    `timeout` or `error`. Identical ideas within the batch are analyzed once.
+    """
+    
+    items = request.items
+    if len(items) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(items)} items (max {settings.BATCH_MAX_ITEMS})"
+        )
+    
+    openai_service = get_openai_service()
+    if not openai_service and any(not item.custom_data for item in items):
+        raise HTTPException(
+            status_code=503,
+            detail="OpenAI service is not available. Please configure OPENAI_API_KEY in environment variables."
+        )
+    
+    concurrency = max(1, min(request.concurrency or settings.BATCH_DEFAULT_CONCURRENCY, settings.BATCH_MAX_CONCURRENCY))
+    item_timeout = min(request.item_timeout or settings.BATCH_ITEM_TIMEOUT, settings.BATCH_ITEM_TIMEOUT)
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    # Group indices of identical requests so each distinct idea runs once
+    groups: Dict[str, List[int]] = {}
+    for index, item in enumerate(items):
+        key = f"custom:{index}" if item.custom_data else openai_service.cache_key(item.project_idea, item.language)
+        groups.setdefault(key, []).append(index)
+    
+    async def run(item: ProjectAnalyzeRequest) -> ProjectAnalyzeResponse:
+        async with semaphore:
+            if item.custom_data:
+                return _generate_prompt_from_custom_data(item.project_idea, item.custom_data)
+            
+            similar = await _find_similar_analysis(item.project_idea, item.language)
+            if similar is not None:
+                return similar[1]
+            
+            analysis_result = await asyncio.wait_for(
+                openai_service.analyze_project(
+                    project_idea=item.project_idea,
+                    language=item.language,
+                    timeout=item_timeout,
+                    user_session=item.user_session
+                ),
+                timeout=item_timeout
+            )
+            return _build_project_response(item.project_idea, analysis_result)
+    
+    async def lines():
+        tasks = {asyncio.ensure_future(run(items[indices[0]])): indices for indices in groups.values()}
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        outcome = {"status": "ok", "result": task.result().model_dump()}
+                    elif isinstance(task.exception(), asyncio.TimeoutError):
+                        outcome = {"status": "timeout", "error": f"Analysis exceeded {item_timeout}s"}
+                    else:
+                        outcome = {"status": "error", "error": str(task.exception())}
+                    
+                    for index in tasks[task]:
+                        yield json.dumps({"index": index, **outcome}) + "\n"
+        finally:
+            # Stop outstanding work if the client disconnects mid-batch
+            for task in pending:
+                task.cancel()
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+def _sse_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def _build_project_response(project_idea: str, analysis_result: Dict[str, Any]) -> ProjectAnalyzeResponse:
+    """Convert a raw analysis dict to the response model, falling back to the mock analysis"""
+    try:
         # Convert the analysis result to response models
         detected_stack = TechStack(**analysis_result["detectedStack"])
         recommended_tool = AITool(**analysis_result["recommendedTool"])
@@ -163,7 +322,24 @@ async def analyze_project(request: ProjectAnalyzeRequest):
     except Exception as e:
         # Fallback to mock analysis if OpenAI fails
         print(f"OpenAI analysis failed: {e}")
-        return _get_mock_analysis(request.project_idea)
+        return _get_mock_analysis(project_idea)
+
+async def _find_similar_analysis(project_idea: str, language: str) -> Optional[Tuple[float, ProjectAnalyzeResponse]]:
+    """A prior analysis of a near-duplicate idea, re-targeted at this idea"""
+    match = await similarity_index.find(project_idea, language)
+    if match is None:
+        return None
+    
+    score, analysis = match
+    try:
+        # Same path as user-edited data: keep the specs, regenerate the prompt
+        reused = _generate_prompt_from_custom_data(project_idea, analysis)
+    except Exception as e:
+        print(f"Similar analysis could not be reused: {e}")
+        return None
+    reused.reasoning = f"Reused the analysis of a similar project idea (similarity {score:.2f})"
+    ANALYSIS_RESULTS.labels("similarity").inc()
+    return score, reused
 
 def _generate_prompt_from_custom_data(project_idea: str, custom_data: Dict[str, Any]) -> ProjectAnalyzeResponse:
     """Generate a new prompt based on edited data"""
@@ -221,86 +397,28 @@ Please provide a detailed implementation plan and code structure."""
     )
 
 def _get_mock_analysis(project_idea: str) -> ProjectAnalyzeResponse:
-    """Fallback mock analysis when OpenAI service fails"""
-    project_idea_lower = project_idea.lower()
+    """Fallback mock analysis when OpenAI service fails
+    
+    Choices come from the keyword rule table in app/rules/mock_analysis.json,
+    matched against the idea in a single pass.
+    """
+    choices = rule_engine.evaluate(project_idea)
     
-    # Mock tech stack detection
     detected_stack = TechStack(
-        frontend=["React", "Next.js", "TypeScript"] if "react" in project_idea_lower or "frontend" in project_idea_lower else ["Vue.js", "Nuxt.js"],
-        backend=["FastAPI", "Python"] if "python" in project_idea_lower or "api" in project_idea_lower else ["Node.js", "Express"],
-        database=["PostgreSQL", "Redis"] if "database" in project_idea_lower else ["MongoDB"],
-        deployment=["Vercel", "Docker"] if "deploy" in project_idea_lower else ["Netlify"],
-        additional=["Tailwind CSS", "ESLint", "Prettier"]
+        frontend=choices["frontend"],
+        backend=choices["backend"],
+        database=choices["database"],
+        deployment=choices["deployment"],
+        additional=choices["additional"]
     )
-    
-    # Mock AI tool recommendation
-    if "ui" in project_idea_lower or "component" in project_idea_lower:
-        recommended_tool = AITool(
-            name="v0.dev",
-            description="Best for React/Next.js UI component development",
-            bestFor=["UI Components", "React Applications", "Design Systems"],
-            promptStyle="Component-focused with specific requirements"
-        )
-    elif "fullstack" in project_idea_lower or "full-stack" in project_idea_lower:
-        recommended_tool = AITool(
-            name="Cursor.ai",
-            description="Optimal for full-stack application development",
-            bestFor=["Full-stack Apps", "File Structure", "Code Integration"],
-            promptStyle="Detailed file structure and implementation"
-        )
-    else:
-        recommended_tool = AITool(
-            name="Claude Dev",
-            description="Great for complex logic and architecture",
-            bestFor=["Complex Logic", "Architecture Design", "Step-by-step Development"],
-            promptStyle="Analytical and structured approach"
-        )
-    
-    # Mock development structure recommendation
-    if "microservice" in project_idea_lower or "micro-service" in project_idea_lower:
-        dev_structure = DevStructure(
-            type="microservices",
-            name="Microservices Architecture",
-            description="Independent, distributed services architecture",
-            pros=["High scalability", "Technology diversity", "Independent deployment", "Fault isolation"],
-            cons=["Complex coordination", "Network overhead", "Debugging complexity", "Higher operational cost"],
-            bestFor=["Large-scale applications", "Multiple teams", "High availability requirements"]
-        )
-    elif "monorepo" in project_idea_lower or "mono repo" in project_idea_lower:
-        dev_structure = DevStructure(
-            type="monorepo",
-            name="Monorepo Structure",
-            description="Single repository managing multiple projects and packages",
-            pros=["Unified tooling", "Easy refactoring", "Shared dependencies", "Atomic commits"],
-            cons=["Large repository size", "Build complexity", "Access control challenges"],
-            bestFor=["Multiple related projects", "Shared components", "Consistent tooling"]
-        )
-    elif "separate" in project_idea_lower or ("frontend" in project_idea_lower and "backend" in project_idea_lower):
-        dev_structure = DevStructure(
-            type="separated",
-            name="Separated Frontend/Backend",
-            description="Complete separation of frontend and backend codebases",
-            pros=["Clear separation", "Independent scaling", "Technology flexibility", "Team autonomy"],
-            cons=["Coordination overhead", "Duplicate configurations", "API versioning complexity"],
-            bestFor=["Different tech stacks", "Separate teams", "Independent deployment cycles"]
-        )
-    else:
-        dev_structure = DevStructure(
-            type="single-repo",
-            name="Single Repository",
-            description="Traditional single application structure",
-            pros=["Simple setup", "Easy debugging", "Unified deployment", "Lower complexity"],
-            cons=["Limited scalability", "Technology coupling", "Single point of failure"],
-            bestFor=["Small to medium projects", "Single team", "Rapid prototyping"]
-        )
-    
-    # Mock infrastructure tools recommendation
+    recommended_tool = AITool(**choices["recommendedTool"])
+    dev_structure = DevStructure(**choices["devStructure"])
     infra_tools = InfraTools(
-        containerization=["Docker", "Docker Compose"] if "docker" in project_idea else ["Docker"],
-        orchestration=["Kubernetes", "Docker Swarm"] if "kubernetes" in project_idea or "k8s" in project_idea else ["Docker Compose"],
-        cicd=["GitHub Actions", "GitLab CI"] if "github" in project_idea else ["Jenkins", "CircleCI"],
-        monitoring=["Prometheus", "Grafana", "Sentry"] if "monitoring" in project_idea else ["Basic logging"],
-        hosting=["AWS", "Vercel", "Netlify"] if "aws" in project_idea else ["Vercel", "Netlify"]
+        containerization=choices["containerization"],
+        orchestration=choices["orchestration"],
+        cicd=choices["cicd"],
+        monitoring=choices["monitoring"],
+        hosting=choices["hosting"]
     )
     
     # Mock prompt generation
@@ -348,6 +466,17 @@ Please provide a detailed implementation plan and code structure.
         reasoning=reasoning
     )
 
+@router.get("/stats")
+async def get_analysis_stats():
+    """Get operational counters for the project analysis pipeline"""
+    openai_service = get_openai_service()
+    return {
+        "cache": analysis_cache.stats(),
+        "inflight": openai_service.inflight.stats() if openai_service else None,
+        "scheduler": openai_service.scheduler.stats() if openai_service else None,
+        "similarity": similarity_index.stats()
+    }
+
 @router.get("/types")
 async def get_analysis_types():
     """Get available analysis types"""
@@ -1,9 +1,18 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List, Optional
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from typing import Any, Dict, List, Optional, Tuple, Type
+from pydantic import BaseModel, ValidationError
 from datetime import datetime
-from sqlalchemy.orm import Session
-from app.core.database import get_db, Idea, Comment
+from sqlalchemy import select, func, insert, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload, aliased
+from app.core.conditional import make_etag
+from app.core.config import settings
+from app.core.database import get_db, tags_contain, AsyncSessionLocal, Idea, Comment
+from app.core.export import EXPORT_FORMAT_PATTERN, CURSOR_FIELD, export_response, row_cursor
+from app.core.pagination import page_size, after_cursor, paginate, finish_page
+from app.core.projection import parse_fields, load_columns
+from app.core.responses import json_response
+from app.services.entity_cache import entity_cache, idea_namespace, session_ideas_namespace
 import uuid
 
 router = APIRouter()
@@ -29,15 +38,17 @@ class IdeaCreate(BaseModel):
     user_session: str
 
 class IdeaResponse(BaseModel):
+    # Optional so that `fields` projections can leave attributes out
     id: str
-    title: str
-    description: str
+    title: Optional[str] = None
+    description: Optional[str] = None
     category: Optional[str] = None
-    tags: List[str] = []
-    user_session: str
+    tags: Optional[List[str]] = None
+    user_session: Optional[str] = None
     created_at: str
-    updated_at: str
-    comments: List[CommentResponse] = []
+    updated_at: Optional[str] = None
+    comments: Optional[List[CommentResponse]] = None
+    comment_count: Optional[int] = None
 
 class IdeaUpdate(BaseModel):
     title: Optional[str] = None
@@ -45,44 +56,222 @@ class IdeaUpdate(BaseModel):
     category: Optional[str] = None
     tags: Optional[List[str]] = None
 
-@router.get("/", response_model=List[IdeaResponse])
-async def get_ideas(session: Optional[str] = None, db: Session = Depends(get_db)):
-    """Get all ideas for a user session"""
-    query = db.query(Idea)
-    if session:
-        query = query.filter(Idea.user_session == session)
-    
-    ideas = query.all()
-    
-    # Convert to response format
-    result = []
-    for idea in ideas:
-        idea_dict = {
-            "id": idea.id,
-            "title": idea.title,
-            "description": idea.description,
-            "category": idea.category,
-            "tags": idea.tags or [],
-            "user_session": idea.user_session,
-            "created_at": idea.created_at.isoformat(),
-            "updated_at": idea.updated_at.isoformat(),
-            "comments": [
-                {
-                    "id": comment.id,
-                    "idea_id": comment.idea_id,
-                    "content": comment.content,
-                    "user_session": comment.user_session,
-                    "created_at": comment.created_at.isoformat()
-                }
-                for comment in idea.comments
-            ]
-        }
-        result.append(idea_dict)
+class BulkCommentItem(BaseModel):
+    content: str
+    user_session: str
+
+class BulkCreateRequest(BaseModel):
+    # Items are validated one by one so errors can be reported per index
+    items: List[Dict[str, Any]]
+    atomic: bool = True
+
+class BulkDeleteRequest(BaseModel):
+    ids: List[str]
+
+# How comments are embedded in idea responses
+COMMENTS_MODE_PATTERN = "^(all|latest|count|none)$"
+
+async def _load_comments(
+    db: AsyncSession, idea_ids: List[str], mode: str, limit: int
+) -> Tuple[Dict[str, List[Comment]], Dict[str, int]]:
+    """Load comments for many ideas in at most two queries
+    
+    mode "all" returns every comment, "latest" the newest `limit` per idea,
+    "count" only per-idea totals and "none" nothing.
+    """
+    comments: Dict[str, List[Comment]] = {}
+    counts: Dict[str, int] = {}
+    if not idea_ids or mode == "none":
+        return comments, counts
+    
+    if mode in ("count", "latest"):
+        rows = await db.execute(
+            select(Comment.idea_id, func.count())
+            .where(Comment.idea_id.in_(idea_ids))
+            .group_by(Comment.idea_id)
+        )
+        counts = dict(rows.all())
+    
+    if mode == "all":
+        query = select(Comment).where(Comment.idea_id.in_(idea_ids)).order_by(Comment.created_at)
+    elif mode == "latest":
+        ranked = select(
+            Comment,
+            func.row_number().over(
+                partition_by=Comment.idea_id,
+                order_by=Comment.created_at.desc()
+            ).label("rank")
+        ).where(Comment.idea_id.in_(idea_ids)).subquery()
+        ranked_comment = aliased(Comment, ranked)
+        query = select(ranked_comment).where(ranked.c.rank <= limit).order_by(ranked.c.created_at)
+    else:
+        return comments, counts
+    
+    for comment in (await db.scalars(query)).all():
+        comments.setdefault(comment.idea_id, []).append(comment)
+    if mode == "all":
+        counts = {idea_id: len(items) for idea_id, items in comments.items()}
+    return comments, counts
+
+def _version_query():
+    """Columns that change whenever an idea's representation does
     
+    Compared instead of the rows themselves to answer conditional GETs;
+    comment stats come from the (idea_id, created_at) index.
+    """
+    return select(
+        Idea.id,
+        func.coalesce(Idea.updated_at, Idea.created_at).label("modified"),
+        select(func.count()).where(Comment.idea_id == Idea.id).scalar_subquery().label("comment_count"),
+        select(func.max(Comment.created_at)).where(Comment.idea_id == Idea.id).scalar_subquery().label("last_comment_at")
+    )
+
+def _comment_dict(comment: Comment) -> dict:
+    return {
+        "id": comment.id,
+        "idea_id": comment.idea_id,
+        "content": comment.content,
+        "user_session": comment.user_session,
+        "created_at": comment.created_at
+    }
+
+# Column fields and how each is read off an Idea row
+IDEA_COLUMN_FIELDS = {
+    "id": lambda idea: idea.id,
+    "title": lambda idea: idea.title,
+    "description": lambda idea: idea.description,
+    "category": lambda idea: idea.category,
+    "tags": lambda idea: idea.tags or [],
+    "user_session": lambda idea: idea.user_session,
+    "created_at": lambda idea: idea.created_at,
+    "updated_at": lambda idea: idea.updated_at
+}
+IDEA_FIELDS = [*IDEA_COLUMN_FIELDS, "comments", "comment_count"]
+
+def _idea_dict(
+    idea: Idea, comments: List[Comment], comment_count: Optional[int], fields: Optional[List[str]] = None
+) -> dict:
+    fields = fields or IDEA_FIELDS
+    result = {field: IDEA_COLUMN_FIELDS[field](idea) for field in fields if field in IDEA_COLUMN_FIELDS}
+    if "comments" in fields:
+        result["comments"] = [_comment_dict(comment) for comment in comments]
+    if "comment_count" in fields:
+        result["comment_count"] = comment_count
     return result
 
+def _comments_mode(mode: str, fields: List[str]) -> str:
+    """Narrow the comment loading mode to what the projection returns"""
+    if "comments" in fields or mode == "none":
+        return mode
+    return "count" if "comment_count" in fields else "none"
+
+def _validate_items(items: List[Dict[str, Any]], model: Type[BaseModel]) -> Tuple[List[BaseModel], List[dict]]:
+    """Validate every bulk item up front, collecting errors by index"""
+    if len(items) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(items)} items (max {settings.BULK_MAX_ITEMS})"
+        )
+    
+    valid, errors = [], []
+    for index, item in enumerate(items):
+        try:
+            valid.append(model.model_validate(item))
+        except ValidationError as e:
+            errors.append({
+                "index": index,
+                "errors": [{"loc": list(error["loc"]), "msg": error["msg"], "type": error["type"]} for error in e.errors()]
+            })
+    return valid, errors
+
+def _filter_ideas(
+    query,
+    session: Optional[str],
+    category: Optional[str],
+    tags: Optional[List[str]],
+    created_after: Optional[datetime],
+    created_before: Optional[datetime]
+):
+    if session:
+        query = query.where(Idea.user_session == session)
+    if category:
+        query = query.where(Idea.category == category)
+    if tags:
+        query = query.where(tags_contain(Idea.tags, tags))
+    if created_after:
+        query = query.where(Idea.created_at >= created_after)
+    if created_before:
+        query = query.where(Idea.created_at < created_before)
+    return query
+
+def _check_bulk_errors(errors: List[dict], atomic: bool) -> None:
+    # Atomic batches are all-or-nothing; otherwise valid items still go in
+    if errors and atomic:
+        raise HTTPException(status_code=422, detail={"message": "No items were written", "errors": errors})
+
+@router.get("/", response_model=List[IdeaResponse])
+async def get_ideas(
+    request: Request,
+    response: Response,
+    session: Optional[str] = None,
+    category: Optional[str] = None,
+    tags: Optional[List[str]] = Query(None),
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    comments: str = Query("all", pattern=COMMENTS_MODE_PATTERN),
+    comments_limit: int = Query(3, ge=1, le=100),
+    fields: Optional[str] = None
+):
+    """Get ideas for a user session, newest first
+    
+    Results are paginated by keyset on (created_at, id); when more rows
+    exist the `X-Next-Cursor` header holds the `cursor` for the next page.
+    `tags` matches ideas carrying all of the given tags.
+    `comments` selects how comments are embedded: all of them, the
+    `comments_limit` latest per idea, only a count, or none.
+    `fields=id,title,created_at` loads and returns only the named fields;
+    comments are not queried unless `comments` or `comment_count` is asked for.
+    Responses carry an `ETag`; a matching `If-None-Match` gets a 304
+    without the page being loaded. Pages of a `session`'s listing are cached
+    until that session's ideas or their comments change.
+    """
+    fields = parse_fields(fields, IDEA_FIELDS)
+    comments = _comments_mode(comments, fields)
+    limit = page_size(limit)
+    
+    async def validators():
+        async with AsyncSessionLocal() as db:
+            versions = (await db.execute(paginate(
+                _filter_ideas(_version_query(), session, category, tags, created_after, created_before),
+                Idea.created_at, Idea.id, cursor, limit
+            ))).all()
+        # Deletions leave no timestamp behind, so lists are validated by ETag only
+        return make_etag("ideas", request.url.query, [tuple(version) for version in versions]), None
+    
+    async def load(page_response: Response):
+        query = _filter_ideas(
+            select(Idea).options(load_columns(Idea, fields)),
+            session, category, tags, created_after, created_before
+        )
+        query = paginate(query, Idea.created_at, Idea.id, cursor, limit)
+        async with AsyncSessionLocal() as db:
+            ideas = finish_page((await db.scalars(query)).all(), limit, request, page_response)
+            comment_map, counts = await _load_comments(db, [idea.id for idea in ideas], comments, comments_limit)
+        
+        # Convert to response format
+        return [
+            _idea_dict(idea, comment_map.get(idea.id, []), counts.get(idea.id, 0) if comments != "none" else None, fields)
+            for idea in ideas
+        ]
+    
+    return await entity_cache.read(
+        request, response, session_ideas_namespace(session) if session else None, validators, load
+    )
+
 @router.post("/", response_model=IdeaResponse)
-async def create_idea(idea: IdeaCreate, db: Session = Depends(get_db)):
+async def create_idea(idea: IdeaCreate, db: AsyncSession = Depends(get_db)):
     """Create a new idea"""
     db_idea = Idea(
         title=idea.title,
@@ -93,53 +282,141 @@ async def create_idea(idea: IdeaCreate, db: Session = Depends(get_db)):
     )
     
     db.add(db_idea)
-    db.commit()
-    db.refresh(db_idea)
+    await db.commit()
+    await db.refresh(db_idea)
+    await entity_cache.invalidate(session_ideas_namespace(db_idea.user_session))
     
-    return {
-        "id": db_idea.id,
-        "title": db_idea.title,
-        "description": db_idea.description,
-        "category": db_idea.category,
-        "tags": db_idea.tags or [],
-        "user_session": db_idea.user_session,
-        "created_at": db_idea.created_at.isoformat(),
-        "updated_at": db_idea.updated_at.isoformat(),
-        "comments": []
-    }
+    return json_response(_idea_dict(db_idea, [], 0))
+
+@router.post("/bulk")
+async def create_ideas_bulk(request: BulkCreateRequest, db: AsyncSession = Depends(get_db)):
+    """Create many ideas in one transaction
+    
+    Items are inserted with multi-row INSERT ... RETURNING. With `atomic`
+    (the default) any invalid item rejects the whole batch; otherwise valid
+    items are created and invalid ones are listed in `errors` by index.
+    """
+    ideas, errors = _validate_items(request.items, IdeaCreate)
+    _check_bulk_errors(errors, request.atomic)
+    
+    created = []
+    if ideas:
+        rows = (await db.scalars(insert(Idea).returning(Idea), [idea.model_dump() for idea in ideas])).all()
+        await db.commit()
+        await entity_cache.invalidate(*{session_ideas_namespace(idea.user_session) for idea in rows})
+        created = [_idea_dict(idea, [], 0) for idea in rows]
+    
+    return json_response({"created": created, "errors": errors})
+
+@router.delete("/bulk")
+async def delete_ideas_bulk(request: BulkDeleteRequest, db: AsyncSession = Depends(get_db)):
+    """Delete many ideas and their comments in one transaction"""
+    if len(request.ids) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(request.ids)} items (max {settings.BULK_MAX_ITEMS})"
+        )
+    
+    ids = list(dict.fromkeys(request.ids))
+    # Bulk deletes bypass the ORM cascade, so comments go first
+    await db.execute(delete(Comment).where(Comment.idea_id.in_(ids)))
+    rows = (await db.execute(delete(Idea).where(Idea.id.in_(ids)).returning(Idea.id, Idea.user_session))).all()
+    await db.commit()
+    await entity_cache.invalidate(
+        *(idea_namespace(idea_id) for idea_id, _ in rows),
+        *(session_ideas_namespace(user_session) for _, user_session in rows)
+    )
+    
+    deleted = [idea_id for idea_id, _ in rows]
+    found = set(deleted)
+    return {"deleted": deleted, "not_found": [idea_id for idea_id in ids if idea_id not in found]}
+
+@router.get("/export")
+async def export_ideas(
+    session: Optional[str] = None,
+    category: Optional[str] = None,
+    tags: Optional[List[str]] = Query(None),
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    format: str = Query("ndjson", pattern=EXPORT_FORMAT_PATTERN),
+    gzip: bool = False,
+    comments: str = Query("all", pattern=COMMENTS_MODE_PATTERN),
+    comments_limit: int = Query(3, ge=1, le=100),
+    fields: Optional[str] = None
+):
+    """Stream every matching idea, oldest first, as NDJSON or CSV
+    
+    Rows are read through a server-side cursor in batches, so memory stays
+    flat however large the export. Each row carries a `_cursor`; after an
+    interrupted download, pass the last one received as `cursor` to resume.
+    Filters, `comments` and `fields` work as in `GET /ideas`.
+    """
+    fields = parse_fields(fields, IDEA_FIELDS)
+    comments = _comments_mode(comments, fields)
+    
+    query = _filter_ideas(
+        select(Idea).options(load_columns(Idea, fields)),
+        session, category, tags, created_after, created_before
+    )
+    query = after_cursor(query, Idea.created_at, Idea.id, cursor, descending=False)
+    
+    async def batches():
+        # Comments are looked up on a second session while the cursor stays open
+        async with AsyncSessionLocal() as db, AsyncSessionLocal() as lookups:
+            result = await db.stream_scalars(query.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+            async for ideas in result.partitions():
+                comment_map, counts = await _load_comments(lookups, [idea.id for idea in ideas], comments, comments_limit)
+                yield [
+                    {
+                        **_idea_dict(idea, comment_map.get(idea.id, []), counts.get(idea.id, 0) if comments != "none" else None, fields),
+                        CURSOR_FIELD: row_cursor(idea)
+                    }
+                    for idea in ideas
+                ]
+    
+    return export_response(batches(), format, fields, "ideas", gzip)
 
 @router.get("/{idea_id}", response_model=IdeaResponse)
-async def get_idea(idea_id: str, db: Session = Depends(get_db)):
-    """Get a specific idea by ID"""
-    idea = db.query(Idea).filter(Idea.id == idea_id).first()
-    if not idea:
-        raise HTTPException(status_code=404, detail="Idea not found")
+async def get_idea(
+    idea_id: str,
+    request: Request,
+    response: Response,
+    comments: str = Query("all", pattern=COMMENTS_MODE_PATTERN),
+    comments_limit: int = Query(3, ge=1, le=100)
+):
+    """Get a specific idea by ID
     
-    return {
-        "id": idea.id,
-        "title": idea.title,
-        "description": idea.description,
-        "category": idea.category,
-        "tags": idea.tags or [],
-        "user_session": idea.user_session,
-        "created_at": idea.created_at.isoformat(),
-        "updated_at": idea.updated_at.isoformat(),
-        "comments": [
-            {
-                "id": comment.id,
-                "idea_id": comment.idea_id,
-                "content": comment.content,
-                "user_session": comment.user_session,
-                "created_at": comment.created_at.isoformat()
-            }
-            for comment in idea.comments
-        ]
-    }
+    Supports `If-None-Match`, with an ETag from the idea's `updated_at` and
+    its comments' count and latest `created_at`, checked before the idea is
+    loaded. `If-Modified-Since` is honored only with `comments=none`: a
+    deleted comment leaves no timestamp behind. The idea is cached until it
+    or its comments change.
+    """
+    async def validators():
+        async with AsyncSessionLocal() as db:
+            version = (await db.execute(_version_query().where(Idea.id == idea_id))).first()
+        if not version:
+            return None
+        return make_etag("idea", request.url.query, tuple(version)), version.modified if comments == "none" else None
+    
+    async def load(_: Response):
+        async with AsyncSessionLocal() as db:
+            idea = await db.get(Idea, idea_id)
+            if not idea:
+                raise HTTPException(status_code=404, detail="Idea not found")
+            comment_map, counts = await _load_comments(db, [idea.id], comments, comments_limit)
+        return _idea_dict(idea, comment_map.get(idea.id, []), counts.get(idea.id, 0) if comments != "none" else None)
+    
+    result = await entity_cache.read(request, response, idea_namespace(idea_id), validators, load)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Idea not found")
+    return result
 
 @router.put("/{idea_id}", response_model=IdeaResponse)
-async def update_idea(idea_id: str, idea_update: IdeaUpdate, db: Session = Depends(get_db)):
+async def update_idea(idea_id: str, idea_update: IdeaUpdate, db: AsyncSession = Depends(get_db)):
     """Update a specific idea"""
-    idea = db.query(Idea).filter(Idea.id == idea_id).first()
+    idea = await db.scalar(select(Idea).options(selectinload(Idea.comments)).where(Idea.id == idea_id))
     if not idea:
         raise HTTPException(status_code=404, detail="Idea not found")
     
@@ -154,46 +431,28 @@ async def update_idea(idea_id: str, idea_update: IdeaUpdate, db: Session = Depen
         idea.tags = idea_update.tags
     
     idea.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(idea)
+    await db.commit()
+    await entity_cache.invalidate(idea_namespace(idea_id), session_ideas_namespace(idea.user_session))
     
-    return {
-        "id": idea.id,
-        "title": idea.title,
-        "description": idea.description,
-        "category": idea.category,
-        "tags": idea.tags or [],
-        "user_session": idea.user_session,
-        "created_at": idea.created_at.isoformat(),
-        "updated_at": idea.updated_at.isoformat(),
-        "comments": [
-            {
-                "id": comment.id,
-                "idea_id": comment.idea_id,
-                "content": comment.content,
-                "user_session": comment.user_session,
-                "created_at": comment.created_at.isoformat()
-            }
-            for comment in idea.comments
-        ]
-    }
+    return json_response(_idea_dict(idea, idea.comments, len(idea.comments)))
 
 @router.delete("/{idea_id}")
-async def delete_idea(idea_id: str, db: Session = Depends(get_db)):
+async def delete_idea(idea_id: str, db: AsyncSession = Depends(get_db)):
     """Delete a specific idea"""
-    idea = db.query(Idea).filter(Idea.id == idea_id).first()
+    idea = await db.get(Idea, idea_id)
     if not idea:
         raise HTTPException(status_code=404, detail="Idea not found")
     
-    db.delete(idea)  # This will also delete comments due to cascade
-    db.commit()
+    await db.delete(idea)  # This will also delete comments due to cascade
+    await db.commit()
+    await entity_cache.invalidate(idea_namespace(idea_id), session_ideas_namespace(idea.user_session))
     return {"message": "Idea deleted successfully"}
 
 @router.post("/{idea_id}/comments", response_model=CommentResponse)
-async def add_comment(idea_id: str, comment: CommentCreate, db: Session = Depends(get_db)):
+async def add_comment(idea_id: str, comment: CommentCreate, db: AsyncSession = Depends(get_db)):
     """Add a comment to an idea"""
     # Check if idea exists
-    idea = db.query(Idea).filter(Idea.id == idea_id).first()
+    idea = await db.get(Idea, idea_id)
     if not idea:
         raise HTTPException(status_code=404, detail="Idea not found")
     
@@ -204,39 +463,67 @@ async def add_comment(idea_id: str, comment: CommentCreate, db: Session = Depend
     )
     
     db.add(db_comment)
-    db.commit()
-    db.refresh(db_comment)
+    await db.commit()
+    await db.refresh(db_comment)
+    # Listings embed comments, so the owner's pages go too
+    await entity_cache.invalidate(idea_namespace(idea_id), session_ideas_namespace(idea.user_session))
     
-    return {
-        "id": db_comment.id,
-        "idea_id": db_comment.idea_id,
-        "content": db_comment.content,
-        "user_session": db_comment.user_session,
-        "created_at": db_comment.created_at.isoformat()
-    }
+    return json_response(_comment_dict(db_comment))
+
+@router.post("/{idea_id}/comments/bulk")
+async def add_comments_bulk(idea_id: str, request: BulkCreateRequest, db: AsyncSession = Depends(get_db)):
+    """Add many comments to an idea in one transaction
+    
+    Same validation and `atomic` semantics as `POST /ideas/bulk`.
+    """
+    comments, errors = _validate_items(request.items, BulkCommentItem)
+    _check_bulk_errors(errors, request.atomic)
+    
+    idea = await db.get(Idea, idea_id)
+    if not idea:
+        raise HTTPException(status_code=404, detail="Idea not found")
+    
+    created = []
+    if comments:
+        rows = (await db.scalars(
+            insert(Comment).returning(Comment),
+            [{**comment.model_dump(), "idea_id": idea_id} for comment in comments]
+        )).all()
+        await db.commit()
+        await entity_cache.invalidate(idea_namespace(idea_id), session_ideas_namespace(idea.user_session))
+        created = [_comment_dict(comment) for comment in rows]
+    
+    return json_response({"created": created, "errors": errors})
 
 @router.get("/{idea_id}/comments", response_model=List[CommentResponse])
-async def get_comments(idea_id: str, db: Session = Depends(get_db)):
-    """Get all comments for an idea"""
-    comments = db.query(Comment).filter(Comment.idea_id == idea_id).all()
-    return [
-        {
-            "id": comment.id,
-            "idea_id": comment.idea_id,
-            "content": comment.content,
-            "user_session": comment.user_session,
-            "created_at": comment.created_at.isoformat()
-        }
-        for comment in comments
-    ]
+async def get_comments(idea_id: str, request: Request, response: Response):
+    """Get all comments for an idea
+    
+    Supports `If-None-Match`; cached with the idea until a comment changes.
+    """
+    async def validators():
+        async with AsyncSessionLocal() as db:
+            count, latest = (await db.execute(
+                select(func.count(), func.max(Comment.created_at)).where(Comment.idea_id == idea_id)
+            )).one()
+        return make_etag("comments", idea_id, count, latest), None
+    
+    async def load(_: Response):
+        async with AsyncSessionLocal() as db:
+            comments = (await db.scalars(select(Comment).where(Comment.idea_id == idea_id))).all()
+        return [_comment_dict(comment) for comment in comments]
+    
+    return await entity_cache.read(request, response, idea_namespace(idea_id), validators, load)
 
 @router.delete("/comments/{comment_id}")
-async def delete_comment(comment_id: str, db: Session = Depends(get_db)):
+async def delete_comment(comment_id: str, db: AsyncSession = Depends(get_db)):
     """Delete a comment"""
-    comment = db.query(Comment).filter(Comment.id == comment_id).first()
+    comment = await db.get(Comment, comment_id)
     if not comment:
         raise HTTPException(status_code=404, detail="Comment not found")
     
-    db.delete(comment)
-    db.commit()
+    user_session = await db.scalar(select(Idea.user_session).where(Idea.id == comment.idea_id))
+    await db.delete(comment)
+    await db.commit()
+    await entity_cache.invalidate(idea_namespace(comment.idea_id), session_ideas_namespace(user_session))
     return {"message": "Comment deleted successfully"} 
\ No newline at end of file
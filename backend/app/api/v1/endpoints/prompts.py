@@ -1,8 +1,17 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
 from typing import List, Optional
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
-from app.core.database import get_db, Prompt
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.conditional import make_etag
+from app.core.config import settings
+from app.core.database import get_db, json_list_contains, AsyncSessionLocal, Prompt
+from app.core.export import EXPORT_FORMAT_PATTERN, CURSOR_FIELD, export_response, row_cursor
+from app.core.pagination import page_size, after_cursor, paginate, finish_page
+from app.core.projection import parse_fields, load_columns
+from app.core.responses import json_response
+from app.services.entity_cache import entity_cache, prompt_namespace, session_prompts_namespace
+from app.services.similarity import similarity_index
 from datetime import datetime
 import uuid
 
@@ -48,18 +57,19 @@ class PromptCreate(BaseModel):
     user_session: str
 
 class PromptResponse(BaseModel):
+    # Optional so that `fields` projections can leave attributes out
     id: str
-    project_idea: str
-    detected_stack: DetectedStack
-    recommended_tool: str
-    dev_structure: DevStructure
-    infra_tools: InfraTools
-    generated_prompt: str
-    final_prompt: str
-    is_finalized: bool
-    user_session: str
+    project_idea: Optional[str] = None
+    detected_stack: Optional[DetectedStack] = None
+    recommended_tool: Optional[str] = None
+    dev_structure: Optional[DevStructure] = None
+    infra_tools: Optional[InfraTools] = None
+    generated_prompt: Optional[str] = None
+    final_prompt: Optional[str] = None
+    is_finalized: Optional[bool] = None
+    user_session: Optional[str] = None
     created_at: str
-    updated_at: str
+    updated_at: Optional[str] = None
 
 class PromptUpdate(BaseModel):
     title: Optional[str] = None
@@ -67,48 +77,117 @@ class PromptUpdate(BaseModel):
     category: Optional[str] = None
     tags: Optional[List[str]] = None
 
+# Response fields and how each is read off a Prompt row
+PROMPT_FIELDS = {
+    "id": lambda prompt: prompt.id,
+    "project_idea": lambda prompt: prompt.project_idea,
+    "detected_stack": lambda prompt: prompt.detected_stack,
+    "recommended_tool": lambda prompt: prompt.recommended_tool,
+    "dev_structure": lambda prompt: prompt.dev_structure,
+    "infra_tools": lambda prompt: prompt.infra_tools,
+    "generated_prompt": lambda prompt: prompt.generated_prompt,
+    "final_prompt": lambda prompt: prompt.final_prompt,
+    "is_finalized": lambda prompt: prompt.is_finalized == "true",
+    "user_session": lambda prompt: prompt.user_session,
+    "created_at": lambda prompt: prompt.created_at,
+    "updated_at": lambda prompt: prompt.updated_at
+}
+
+def _parse_stack_filters(stack: Optional[List[str]]) -> List[tuple]:
+    """Split `category:value` filters such as `backend:FastAPI`"""
+    filters = []
+    for item in stack or []:
+        category, _, value = item.partition(":")
+        if category not in DetectedStack.model_fields or not value:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid stack filter '{item}', expected one of {', '.join(DetectedStack.model_fields)} followed by ':value'"
+            )
+        filters.append((category, value))
+    return filters
+
+def _filter_prompts(
+    query,
+    session: Optional[str],
+    is_finalized: Optional[bool],
+    stack: Optional[List[str]],
+    created_after: Optional[datetime],
+    created_before: Optional[datetime]
+):
+    if session:
+        query = query.where(Prompt.user_session == session)
+    if is_finalized is not None:
+        query = query.where(Prompt.is_finalized == ("true" if is_finalized else "false"))
+    for category, value in _parse_stack_filters(stack):
+        query = query.where(json_list_contains(Prompt.detected_stack, category, value))
+    if created_after:
+        query = query.where(Prompt.created_at >= created_after)
+    if created_before:
+        query = query.where(Prompt.created_at < created_before)
+    return query
+
+def _prompt_dict(prompt: Prompt, fields: Optional[List[str]] = None) -> dict:
+    return {field: PROMPT_FIELDS[field](prompt) for field in fields or PROMPT_FIELDS}
+
 @router.get("/", response_model=List[PromptResponse])
-async def get_prompts(session: Optional[str] = None, db: Session = Depends(get_db)):
-    """Get all prompts for a user session"""
-    import json
+async def get_prompts(
+    request: Request,
+    response: Response,
+    session: Optional[str] = None,
+    is_finalized: Optional[bool] = None,
+    stack: Optional[List[str]] = Query(None),
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1)
+):
+    """Get prompts for a user session, newest first
     
-    query = db.query(Prompt)
-    if session:
-        query = query.filter(Prompt.user_session == session)
+    Results are paginated by keyset on (created_at, id); when more rows
+    exist the `X-Next-Cursor` header holds the `cursor` for the next page.
+    `stack=backend:FastAPI` (repeatable) keeps prompts whose detected stack
+    lists that technology, and `fields=id,project_idea` loads and returns
+    only the named columns. Responses carry an `ETag` for `If-None-Match`,
+    and pages of a `session`'s listing are cached until its prompts change.
+    """
+    fields = parse_fields(fields, PROMPT_FIELDS)
+    limit = page_size(limit)
     
-    prompts = query.all()
+    async def validators():
+        async with AsyncSessionLocal() as db:
+            versions = (await db.execute(paginate(
+                _filter_prompts(
+                    select(Prompt.id, func.coalesce(Prompt.updated_at, Prompt.created_at)),
+                    session, is_finalized, stack, created_after, created_before
+                ),
+                Prompt.created_at, Prompt.id, cursor, limit
+            ))).all()
+        return make_etag("prompts", request.url.query, [tuple(version) for version in versions]), None
     
-    result = []
-    for prompt in prompts:
-        prompt_dict = {
-            "id": prompt.id,
-            "project_idea": prompt.project_idea,
-            "detected_stack": json.loads(prompt.detected_stack),
-            "recommended_tool": prompt.recommended_tool,
-            "dev_structure": json.loads(prompt.dev_structure),
-            "infra_tools": json.loads(prompt.infra_tools),
-            "generated_prompt": prompt.generated_prompt,
-            "final_prompt": prompt.final_prompt,
-            "is_finalized": prompt.is_finalized == "true",
-            "user_session": prompt.user_session,
-            "created_at": prompt.created_at.isoformat(),
-            "updated_at": prompt.updated_at.isoformat()
-        }
-        result.append(prompt_dict)
+    async def load(page_response: Response):
+        query = _filter_prompts(
+            select(Prompt).options(load_columns(Prompt, fields)),
+            session, is_finalized, stack, created_after, created_before
+        )
+        query = paginate(query, Prompt.created_at, Prompt.id, cursor, limit)
+        async with AsyncSessionLocal() as db:
+            prompts = finish_page((await db.scalars(query)).all(), limit, request, page_response)
+        return [_prompt_dict(prompt, fields) for prompt in prompts]
     
-    return result
+    return await entity_cache.read(
+        request, response, session_prompts_namespace(session) if session else None, validators, load
+    )
 
 @router.post("/", response_model=PromptResponse)
-async def create_prompt(prompt: PromptCreate, db: Session = Depends(get_db)):
+async def create_prompt(prompt: PromptCreate, db: AsyncSession = Depends(get_db)):
     """Create a new prompt"""
-    import json
-    
     db_prompt = Prompt(
         project_idea=prompt.project_idea,
-        detected_stack=json.dumps(prompt.detected_stack.dict()),
+        detected_stack=prompt.detected_stack.model_dump(),
         recommended_tool=prompt.recommended_tool.name,
-        dev_structure=json.dumps(prompt.dev_structure.dict()),
-        infra_tools=json.dumps(prompt.infra_tools.dict()),
+        dev_structure=prompt.dev_structure.model_dump(),
+        infra_tools=prompt.infra_tools.model_dump(),
         generated_prompt=prompt.generated_prompt,
         final_prompt=prompt.final_prompt,
         is_finalized="true" if prompt.is_finalized else "false",
@@ -116,55 +195,83 @@ async def create_prompt(prompt: PromptCreate, db: Session = Depends(get_db)):
     )
     
     db.add(db_prompt)
-    db.commit()
-    db.refresh(db_prompt)
+    await db.commit()
+    await db.refresh(db_prompt)
+    await entity_cache.invalidate(session_prompts_namespace(db_prompt.user_session))
+    similarity_index.add_prompt(db_prompt)
     
-    return {
-        "id": db_prompt.id,
-        "project_idea": db_prompt.project_idea,
-        "detected_stack": json.loads(db_prompt.detected_stack),
-        "recommended_tool": db_prompt.recommended_tool,
-        "dev_structure": json.loads(db_prompt.dev_structure),
-        "infra_tools": json.loads(db_prompt.infra_tools),
-        "generated_prompt": db_prompt.generated_prompt,
-        "final_prompt": db_prompt.final_prompt,
-        "is_finalized": db_prompt.is_finalized == "true",
-        "user_session": db_prompt.user_session,
-        "created_at": db_prompt.created_at.isoformat(),
-        "updated_at": db_prompt.updated_at.isoformat()
-    }
+    return json_response(_prompt_dict(db_prompt))
+
+@router.get("/export")
+async def export_prompts(
+    session: Optional[str] = None,
+    is_finalized: Optional[bool] = None,
+    stack: Optional[List[str]] = Query(None),
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    format: str = Query("ndjson", pattern=EXPORT_FORMAT_PATTERN),
+    gzip: bool = False,
+    fields: Optional[str] = None
+):
+    """Stream every matching prompt, oldest first, as NDJSON or CSV
+    
+    Rows are read through a server-side cursor in batches, so memory stays
+    flat however large the export. Each row carries a `_cursor`; after an
+    interrupted download, pass the last one received as `cursor` to resume.
+    Filters and `fields` work as in `GET /prompts`.
+    """
+    fields = parse_fields(fields, PROMPT_FIELDS)
+    
+    query = _filter_prompts(
+        select(Prompt).options(load_columns(Prompt, fields)),
+        session, is_finalized, stack, created_after, created_before
+    )
+    query = after_cursor(query, Prompt.created_at, Prompt.id, cursor, descending=False)
+    
+    async def batches():
+        async with AsyncSessionLocal() as db:
+            result = await db.stream_scalars(query.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+            async for prompts in result.partitions():
+                yield [{**_prompt_dict(prompt, fields), CURSOR_FIELD: row_cursor(prompt)} for prompt in prompts]
+    
+    return export_response(batches(), format, fields, "prompts", gzip)
 
 @router.get("/{prompt_id}", response_model=PromptResponse)
-async def get_prompt(prompt_id: str, db: Session = Depends(get_db)):
-    """Get a specific prompt by ID"""
-    import json
+async def get_prompt(prompt_id: str, request: Request, response: Response):
+    """Get a specific prompt by ID
     
-    prompt = db.query(Prompt).filter(Prompt.id == prompt_id).first()
-    if not prompt:
-        raise HTTPException(status_code=404, detail="Prompt not found")
+    Supports `If-None-Match` and `If-Modified-Since` against the prompt's
+    `updated_at`, checked before the prompt is loaded. The prompt is cached
+    until it is deleted.
+    """
+    async def validators():
+        async with AsyncSessionLocal() as db:
+            modified = await db.scalar(
+                select(func.coalesce(Prompt.updated_at, Prompt.created_at)).where(Prompt.id == prompt_id)
+            )
+        return (make_etag("prompt", prompt_id, modified), modified) if modified else None
     
-    return {
-        "id": prompt.id,
-        "project_idea": prompt.project_idea,
-        "detected_stack": json.loads(prompt.detected_stack),
-        "recommended_tool": prompt.recommended_tool,
-        "dev_structure": json.loads(prompt.dev_structure),
-        "infra_tools": json.loads(prompt.infra_tools),
-        "generated_prompt": prompt.generated_prompt,
-        "final_prompt": prompt.final_prompt,
-        "is_finalized": prompt.is_finalized == "true",
-        "user_session": prompt.user_session,
-        "created_at": prompt.created_at.isoformat(),
-        "updated_at": prompt.updated_at.isoformat()
-    }
+    async def load(_: Response):
+        async with AsyncSessionLocal() as db:
+            prompt = await db.get(Prompt, prompt_id)
+        if not prompt:
+            raise HTTPException(status_code=404, detail="Prompt not found")
+        return _prompt_dict(prompt)
+    
+    result = await entity_cache.read(request, response, prompt_namespace(prompt_id), validators, load)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Prompt not found")
+    return result
 
 @router.delete("/{prompt_id}")
-async def delete_prompt(prompt_id: str, db: Session = Depends(get_db)):
+async def delete_prompt(prompt_id: str, db: AsyncSession = Depends(get_db)):
     """Delete a specific prompt"""
-    prompt = db.query(Prompt).filter(Prompt.id == prompt_id).first()
+    prompt = await db.get(Prompt, prompt_id)
     if not prompt:
         raise HTTPException(status_code=404, detail="Prompt not found")
     
-    db.delete(prompt)
-    db.commit()
+    await db.delete(prompt)
+    await db.commit()
+    await entity_cache.invalidate(prompt_namespace(prompt_id), session_prompts_namespace(prompt.user_session))
     return {"message": "Prompt deleted successfully"} 
\ No newline at end of file
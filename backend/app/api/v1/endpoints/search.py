@@ -0,0 +1,61 @@
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from typing import List, Optional
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_db
+from app.core.pagination import page_size, encode_position, decode_position, finish_page
+from app.core.responses import json_response
+from app.services.search import SEARCH_TYPES, search
+
+router = APIRouter()
+
+class SearchHit(BaseModel):
+    type: str
+    id: str
+    idea_id: Optional[str] = None  # parent idea of a comment
+    title: Optional[str] = None
+    snippet: str
+    rank: float
+    created_at: str
+
+def _parse_types(types: Optional[str]) -> List[str]:
+    if not types:
+        return list(SEARCH_TYPES)
+    requested = {kind.strip() for kind in types.split(",") if kind.strip()}
+    unknown = sorted(requested.difference(SEARCH_TYPES))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown types: {', '.join(unknown)}; available: {', '.join(SEARCH_TYPES)}")
+    return [kind for kind in SEARCH_TYPES if kind in requested]
+
+def _decode_search_cursor(cursor: Optional[str]):
+    if not cursor:
+        return None
+    try:
+        rank, id = decode_position(cursor)
+        return float(rank), str(id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("/", response_model=List[SearchHit])
+async def search_all(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1),
+    session: Optional[str] = None,
+    types: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    db: AsyncSession = Depends(get_db)
+):
+    """Full-text search over ideas, comments and prompts, best match first
+    
+    Every word of `q` must match, and each word also matches longer words it
+    is a prefix of (`fast` finds `FastAPI`). `types=idea,comment` limits the
+    kinds of result and `session` scopes them to one user session. Paging
+    works as in the list endpoints via `cursor` and `X-Next-Cursor`.
+    """
+    kinds = _parse_types(types)
+    limit = page_size(limit)
+    hits = await search(db, q, session, kinds, _decode_search_cursor(cursor), limit)
+    hits = finish_page(hits, limit, request, response, cursor_for=lambda hit: encode_position(hit["rank"], hit["id"]))
+    return json_response(hits, response)
@@ -0,0 +1,58 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional
+from fastapi import Request, Response
+
+# Clients may keep responses but must revalidate them before each use
+CACHE_CONTROL = "private, no-cache"
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag over everything a representation depends on"""
+    digest = hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+def _http_date(value: datetime) -> datetime:
+    # Stored timestamps are naive UTC; HTTP dates have whole seconds
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.replace(microsecond=0)
+
+def _etag_matches(header: str, etag: str) -> bool:
+    # GET uses the weak comparison, so W/ prefixes are ignored
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or etag in (candidate.removeprefix("W/") for candidate in candidates)
+
+def check_conditional(
+    request: Request, response: Response, etag: str, last_modified: Optional[datetime] = None
+) -> Optional[Response]:
+    """Set the validators on `response`, or return a 304 when the client's copy is current
+
+    Handlers compute `etag` (and `last_modified`) from a cheap query and
+    call this before loading rows. `If-None-Match` takes precedence over
+    `If-Modified-Since`, which is only honored when `last_modified` is known.
+    """
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    if last_modified is not None:
+        response.headers["Last-Modified"] = format_datetime(_http_date(last_modified), usegmt=True)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        fresh = _etag_matches(if_none_match, etag)
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since is None or last_modified is None:
+            return None
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return None
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        fresh = _http_date(last_modified) <= since
+
+    if not fresh:
+        return None
+    headers = {key: value for key, value in response.headers.items() if key != "content-length"}
+    return Response(status_code=304, headers=headers)
@@ -13,7 +13,8 @@ def clean_database_url(url: str) -> str:
     for prefix in prefixes_to_remove:
         if url.startswith(prefix):
             cleaned_url = url[len(prefix):]
-            print(f"DEBUG: Cleaned DATABASE_URL from '{url}' to '{cleaned_url}'")
+            # Never echo the URL itself: it carries the database password
+            print(f"Removed a '{prefix}' prefix from DATABASE_URL")
             return cleaned_url
     
     return url
@@ -30,6 +31,27 @@ class Settings(BaseSettings):
     def DATABASE_URL(self) -> Optional[str]:
         return clean_database_url(self._raw_database_url) if self._raw_database_url else None
     
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_CREATE_TABLES: bool = os.getenv("DB_CREATE_TABLES", "True").lower() == "true"
+    DB_CHECK_SCHEMA: bool = os.getenv("DB_CHECK_SCHEMA", "True").lower() == "true"
+    
+    # Startup Settings
+    STARTUP_DB_TIMEOUT: float = float(os.getenv("STARTUP_DB_TIMEOUT", "10"))
+    STARTUP_BUDGET: float = float(os.getenv("STARTUP_BUDGET", "2"))  # seconds; slower startups are reported
+    
+    # Pagination Settings
+    PAGE_SIZE_DEFAULT: int = int(os.getenv("PAGE_SIZE_DEFAULT", "100"))
+    PAGE_SIZE_MAX: int = int(os.getenv("PAGE_SIZE_MAX", "500"))
+    
+    # Bulk Write Settings
+    BULK_MAX_ITEMS: int = int(os.getenv("BULK_MAX_ITEMS", "5000"))
+    
+    # Export Settings (rows fetched per server-side cursor round trip)
+    EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+    
     # Security Settings
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here")
     ALGORITHM: str = "HS256"
@@ -37,6 +59,69 @@ class Settings(BaseSettings):
     
     # OpenAI Settings
     OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
+    OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "gpt-4")
+    OPENAI_BASE_URL: str = os.getenv("OPENAI_BASE_URL") or "https://api.openai.com/v1"
+    OPENAI_TIMEOUT: float = float(os.getenv("OPENAI_TIMEOUT", "60"))
+    OPENAI_CONNECT_TIMEOUT: float = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5"))
+    OPENAI_MAX_RETRIES: int = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+    OPENAI_MAX_CONNECTIONS: int = int(os.getenv("OPENAI_MAX_CONNECTIONS", "100"))
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    OPENAI_RPM_LIMIT: int = int(os.getenv("OPENAI_RPM_LIMIT", "500"))
+    OPENAI_TPM_LIMIT: int = int(os.getenv("OPENAI_TPM_LIMIT", "40000"))
+    OPENAI_BACKOFF_BASE: float = float(os.getenv("OPENAI_BACKOFF_BASE", "1"))
+    OPENAI_BACKOFF_MAX: float = float(os.getenv("OPENAI_BACKOFF_MAX", "30"))
+    
+    # Analysis Cache Settings
+    ANALYSIS_CACHE_ENABLED: bool = os.getenv("ANALYSIS_CACHE_ENABLED", "True").lower() == "true"
+    ANALYSIS_CACHE_TTL: int = int(os.getenv("ANALYSIS_CACHE_TTL", "86400"))
+    ANALYSIS_CACHE_MAX_ENTRIES: int = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "1024"))
+    ANALYSIS_CACHE_SQL: bool = os.getenv("ANALYSIS_CACHE_SQL", "False").lower() == "true"
+    ANALYSIS_CACHE_SQL_MAX_ENTRIES: int = int(os.getenv("ANALYSIS_CACHE_SQL_MAX_ENTRIES", "100000"))
+    
+    # Entity Cache Settings (ideas, comments and prompts served by GET)
+    ENTITY_CACHE_ENABLED: bool = os.getenv("ENTITY_CACHE_ENABLED", "True").lower() == "true"
+    ENTITY_CACHE_TTL: int = int(os.getenv("ENTITY_CACHE_TTL", "300"))
+    ENTITY_CACHE_MAX_ENTRIES: int = int(os.getenv("ENTITY_CACHE_MAX_ENTRIES", "10000"))
+    ENTITY_CACHE_REDIS_URL: str = os.getenv("ENTITY_CACHE_REDIS_URL", "")
+    # Without Redis, cache only when the app runs as a single process
+    ENTITY_CACHE_IN_PROCESS: bool = os.getenv("ENTITY_CACHE_IN_PROCESS", "False").lower() == "true"
+    
+    # Similar-Idea Reuse Settings
+    SIMILARITY_ENABLED: bool = os.getenv("SIMILARITY_ENABLED", "True").lower() == "true"
+    SIMILARITY_THRESHOLD: float = float(os.getenv("SIMILARITY_THRESHOLD", "0.75"))  # calibrated by benchmarks.similarity
+    SIMILARITY_DIM: int = int(os.getenv("SIMILARITY_DIM", "1024"))
+    SIMILARITY_MAX_ENTRIES: int = int(os.getenv("SIMILARITY_MAX_ENTRIES", "50000"))
+    SIMILARITY_ANN: bool = os.getenv("SIMILARITY_ANN", "False").lower() == "true"
+    SIMILARITY_ANN_PLANES: int = int(os.getenv("SIMILARITY_ANN_PLANES", "12"))
+    
+    # Keyword rules behind the offline (mock/fallback) project analysis
+    ANALYSIS_RULES_PATH: str = os.getenv(
+        "ANALYSIS_RULES_PATH",
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "rules", "mock_analysis.json")
+    )
+    ANALYSIS_RULES_RELOAD_INTERVAL: float = float(os.getenv("ANALYSIS_RULES_RELOAD_INTERVAL", "1"))
+    
+    # Word valences and emotions behind the offline sentiment analysis
+    SENTIMENT_LEXICON_PATH: str = os.getenv(
+        "SENTIMENT_LEXICON_PATH",
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "rules", "sentiment_lexicon.json")
+    )
+    
+    # Batch Analysis Settings
+    BATCH_MAX_ITEMS: int = int(os.getenv("BATCH_MAX_ITEMS", "500"))
+    BATCH_DEFAULT_CONCURRENCY: int = int(os.getenv("BATCH_DEFAULT_CONCURRENCY", "8"))
+    BATCH_MAX_CONCURRENCY: int = int(os.getenv("BATCH_MAX_CONCURRENCY", "32"))
+    BATCH_ITEM_TIMEOUT: float = float(os.getenv("BATCH_ITEM_TIMEOUT", "120"))
+    
+    # Batch Text Analysis Settings
+    TEXT_BATCH_MAX_ITEMS: int = int(os.getenv("TEXT_BATCH_MAX_ITEMS", "10000"))
+    TEXT_ANALYSIS_POOL_MIN_CHARS: int = int(os.getenv("TEXT_ANALYSIS_POOL_MIN_CHARS", "1000000"))
+    TEXT_ANALYSIS_WORKERS: int = int(os.getenv("TEXT_ANALYSIS_WORKERS", "0"))  # 0 = one per CPU
+    
+    # Observability Settings
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+    READINESS_TIMEOUT: float = float(os.getenv("READINESS_TIMEOUT", "2"))
+    READINESS_UPSTREAM_INTERVAL: float = float(os.getenv("READINESS_UPSTREAM_INTERVAL", "30"))
     
     # CORS Settings
     CORS_ORIGINS: str = os.getenv("CORS_ORIGINS", "http://localhost:3000,http://127.0.0.1:3000")
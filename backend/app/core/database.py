@@ -1,20 +1,79 @@
-from sqlalchemy import create_engine, Column, String, DateTime, Text, ForeignKey
+from sqlalchemy import Column, String, DateTime, Text, ForeignKey, JSON, Index, and_, exists, func, inspect, select, text
+from sqlalchemy.engine import make_url, URL
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
-from sqlalchemy.dialects.postgresql import UUID, ARRAY
+from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import UUID, ARRAY, JSONB
 from datetime import datetime
+from typing import Optional
 import uuid
-import os
 from .config import settings
+from .metrics import instrument_engine
 
-# Debug: Print the DATABASE_URL to identify the issue
-print(f"DEBUG: Using DATABASE_URL = '{settings.DATABASE_URL}'")
+def async_database_url(database_url: str) -> URL:
+    """Point a plain DSN at its async driver: asyncpg for Postgres, aiosqlite for SQLite"""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend in ("postgres", "postgresql"):
+        query = dict(url.query)
+        # asyncpg spells libpq's sslmode as ssl
+        if "sslmode" in query:
+            query["ssl"] = query.pop("sslmode")
+        return url.set(drivername="postgresql+asyncpg", query=query)
+    if backend == "sqlite":
+        return url.set(drivername="sqlite+aiosqlite")
+    return url
 
-engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def _engine_options(url: URL) -> dict:
+    if url.get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": True
+    }
+
+ASYNC_DATABASE_URL = async_database_url(settings.DATABASE_URL)
+# Known from the URL alone, so queries can be built before the engine exists
+DIALECT_NAME = ASYNC_DATABASE_URL.get_backend_name()
+
+_engine: Optional[AsyncEngine] = None
+
+def get_engine() -> AsyncEngine:
+    """The shared engine, created on first use
+    
+    Creating it loads the database driver, which is left out of import time;
+    connections are only opened when a session first needs one.
+    """
+    global _engine
+    if _engine is None:
+        _engine = create_async_engine(ASYNC_DATABASE_URL, **_engine_options(ASYNC_DATABASE_URL))
+        instrument_engine(_engine)
+        AsyncSessionLocal.configure(bind=_engine)
+    return _engine
+
+async def dispose_engine() -> None:
+    """Close pooled connections, if the engine was ever created"""
+    if _engine is not None:
+        await _engine.dispose()
+
+class LazySessionmaker(async_sessionmaker):
+    """Session factory that creates the engine along with the first session"""
+    
+    def __call__(self, **local_kw) -> AsyncSession:
+        if "bind" not in self.kw:
+            get_engine()
+        return super().__call__(**local_kw)
+
+AsyncSessionLocal = LazySessionmaker(class_=AsyncSession, autoflush=False, expire_on_commit=False)
 
 Base = declarative_base()
 
+# Native JSONB on Postgres (indexable, queryable); JSON text elsewhere
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+
 class Idea(Base):
     __tablename__ = "ideas"
     
@@ -22,13 +81,19 @@ class Idea(Base):
     title = Column(String, nullable=False)
     description = Column(Text, nullable=False)
     category = Column(String, nullable=True)
-    tags = Column(ARRAY(String), default=[])
+    tags = Column(ARRAY(String).with_variant(JSON(), "sqlite"), default=[])
     user_session = Column(String, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationship
     comments = relationship("Comment", back_populates="idea", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        Index("ix_ideas_user_session_created_at", "user_session", "created_at", "id"),
+        Index("ix_ideas_created_at_id", "created_at", "id"),
+        Index("ix_ideas_tags", "tags", postgresql_using="gin").ddl_if(dialect="postgresql"),
+    )
 
 class Comment(Base):
     __tablename__ = "comments"
@@ -41,31 +106,120 @@ class Comment(Base):
     
     # Relationship
     idea = relationship("Idea", back_populates="comments")
+    
+    __table_args__ = (
+        Index("ix_comments_idea_id_created_at", "idea_id", "created_at"),
+    )
 
 class Prompt(Base):
     __tablename__ = "prompts"
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     project_idea = Column(Text, nullable=False)
-    detected_stack = Column(Text, nullable=False)  # JSON string
+    detected_stack = Column(JSONType, nullable=False)
     recommended_tool = Column(String, nullable=False)
-    dev_structure = Column(Text, nullable=False)  # JSON string
-    infra_tools = Column(Text, nullable=False)  # JSON string
+    dev_structure = Column(JSONType, nullable=False)
+    infra_tools = Column(JSONType, nullable=False)
     generated_prompt = Column(Text, nullable=False)
     final_prompt = Column(Text, nullable=False)
     is_finalized = Column(String, default="false")  # Store as string
     user_session = Column(String, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        Index("ix_prompts_user_session_created_at", "user_session", "created_at", "id"),
+        Index("ix_prompts_created_at_id", "created_at", "id"),
+        Index(
+            "ix_prompts_detected_stack", "detected_stack",
+            postgresql_using="gin", postgresql_ops={"detected_stack": "jsonb_path_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
+
+class AnalysisCacheEntry(Base):
+    __tablename__ = "analysis_cache"
+    
+    key = Column(String(64), primary_key=True)  # sha256 of normalized request
+    payload = Column(Text, nullable=False)  # JSON string
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
+    
+    __table_args__ = (
+        Index("ix_analysis_cache_created_at", "created_at"),
+    )
+
+# Full-text search vectors, kept by Postgres as generated tsvector columns.
+# The 'simple' configuration lowercases without stemming, so it works for
+# any language. Other dialects use the in-process index in services/search.py.
+SEARCH_VECTORS = {
+    "ideas": "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+             "setweight(to_tsvector('simple', coalesce(description, '')), 'B')",
+    "comments": "to_tsvector('simple', coalesce(content, ''))",
+    "prompts": "setweight(to_tsvector('simple', coalesce(project_idea, '')), 'A') || "
+               "setweight(to_tsvector('simple', coalesce(final_prompt, '')), 'B')",
+}
+
+def tags_contain(column, tags):
+    """Filter for rows whose tag list contains every tag in `tags`"""
+    if DIALECT_NAME == "postgresql":
+        return column.contains(tags)
+    
+    # SQLite stores tags as a JSON array
+    conditions = []
+    for tag in tags:
+        elements = func.json_each(column).table_valued("value")
+        conditions.append(exists(select(1).select_from(elements).where(elements.c.value == tag)))
+    return and_(*conditions)
+
+def json_list_contains(column, key: str, value: str):
+    """Filter for rows whose JSON object `column` has `value` in its `key` list"""
+    if DIALECT_NAME == "postgresql":
+        # Served by the jsonb_path_ops GIN index via @>
+        return column.contains({key: [value]})
+    
+    elements = func.json_each(column, f"$.{key}").table_valued("value")
+    return exists(select(1).select_from(elements).where(elements.c.value == value))
 
 # Dependency to get DB session
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
-# Create tables
-def create_tables():
-    Base.metadata.create_all(bind=engine) 
\ No newline at end of file
+# Create tables (development convenience; deployments run `alembic upgrade head`)
+async def create_tables():
+    async with get_engine().begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        if conn.dialect.name == "postgresql":
+            for table, expression in SEARCH_VECTORS.items():
+                await conn.execute(text(
+                    f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+                    f"GENERATED ALWAYS AS ({expression}) STORED"
+                ))
+                await conn.execute(text(
+                    f"CREATE INDEX IF NOT EXISTS ix_{table}_search ON {table} USING gin (search_vector)"
+                ))
+
+def _index_applies(index: Index, dialect_name: str) -> bool:
+    # GIN indexes only exist on Postgres
+    return dialect_name == "postgresql" or not index.kwargs.get("postgresql_using")
+
+async def find_missing_indexes() -> list[str]:
+    """Names of tables and indexes declared on the models but absent from the database"""
+    def inspect_schema(conn):
+        inspector = inspect(conn)
+        missing = []
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                missing.append(f"table {table.name}")
+                continue
+            existing = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if _index_applies(index, conn.dialect.name) and index.name not in existing:
+                    missing.append(f"index {index.name} on {table.name}")
+            if conn.dialect.name == "postgresql" and table.name in SEARCH_VECTORS:
+                if f"ix_{table.name}_search" not in existing:
+                    missing.append(f"index ix_{table.name}_search on {table.name}")
+        return missing
+    
+    async with get_engine().connect() as conn:
+        return await conn.run_sync(inspect_schema) 
\ No newline at end of file
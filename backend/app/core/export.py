@@ -0,0 +1,77 @@
+import csv
+import io
+import zlib
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List
+import orjson
+from fastapi.responses import StreamingResponse
+from .pagination import encode_cursor
+
+EXPORT_FORMAT_PATTERN = "^(ndjson|csv)$"
+
+# Extra field on every exported row; pass it back as `cursor` to resume after that row
+CURSOR_FIELD = "_cursor"
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8"
+}
+
+def row_cursor(row: Any) -> str:
+    return encode_cursor(row.created_at, row.id)
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (list, dict)):
+        # Nested values are kept as JSON text in a single cell
+        return orjson.dumps(value).decode("utf-8")
+    return value
+
+def _encode_ndjson(rows: List[Dict[str, Any]]) -> bytes:
+    return b"".join(orjson.dumps(row) + b"\n" for row in rows)
+
+def _encode_csv(rows: List[Dict[str, Any]], columns: List[str]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([_csv_value(row.get(column)) for column in columns])
+    return buffer.getvalue().encode("utf-8")
+
+async def _encode(batches: AsyncIterator[List[Dict[str, Any]]], format: str, columns: List[str]) -> AsyncIterator[bytes]:
+    if format == "csv":
+        yield _encode_csv([dict(zip(columns, columns))], columns)
+    async for rows in batches:
+        yield _encode_ndjson(rows) if format == "ndjson" else _encode_csv(rows, columns)
+
+async def _gzip(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(wbits=31)  # gzip container
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+def export_response(
+    batches: AsyncIterator[List[Dict[str, Any]]], format: str, columns: List[str], filename: str, gzip: bool = False
+) -> StreamingResponse:
+    """Stream batches of row dicts as an NDJSON or CSV download
+
+    Only one batch is held in memory at a time. With `gzip` the body is a
+    .gz file rather than a Content-Encoding, so it can be saved as-is.
+    """
+    columns = [*columns, CURSOR_FIELD]
+    body = _encode(batches, format, columns)
+    filename = f"{filename}.{format}"
+    media_type = MEDIA_TYPES[format]
+    if gzip:
+        body = _gzip(body)
+        filename += ".gz"
+        media_type = "application/gzip"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
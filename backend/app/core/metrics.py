@@ -0,0 +1,199 @@
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from prometheus_client import REGISTRY, Counter, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from sqlalchemy import event
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Route label for requests that match no route, so unknown paths can't
+# create unbounded label values
+UNMATCHED_ROUTE = "unmatched"
+
+HTTP_REQUESTS = Counter(
+    "promptify_http_requests_total",
+    "HTTP requests by route template and status code",
+    ["method", "route", "status"]
+)
+HTTP_LATENCY = Histogram(
+    "promptify_http_request_duration_seconds",
+    "Time from request start until the response body was sent",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+)
+HTTP_IN_PROGRESS = Gauge(
+    "promptify_http_requests_in_progress",
+    "Requests currently being handled",
+    ["method", "route"]
+)
+
+DB_QUERY_LATENCY = Histogram(
+    "promptify_db_query_duration_seconds",
+    "SQL statement execution time by statement kind",
+    ["statement"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "promptify_db_queries_per_request",
+    "SQL statements executed while handling one request",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100)
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "promptify_db_time_per_request_seconds",
+    "Total SQL execution time while handling one request",
+    ["route"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+)
+
+OPENAI_LATENCY = Histogram(
+    "promptify_openai_request_duration_seconds",
+    "Time until an OpenAI call answered (response headers, for streams) by outcome",
+    ["operation", "outcome"],
+    buckets=(0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+)
+OPENAI_TOKENS = Counter(
+    "promptify_openai_tokens_total",
+    "Tokens used by OpenAI calls; streamed calls are estimated",
+    ["kind"]
+)
+ANALYSIS_RESULTS = Counter(
+    "promptify_analysis_results_total",
+    "Project analyses by where the answer came from (openai, cache, similarity, fallback)",
+    ["source"]
+)
+
+class RequestDBStats:
+    """SQL statements run on behalf of one request"""
+
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+# Tasks spawned by a request copy its context, so their queries count too
+_request_db_stats: ContextVar[Optional[RequestDBStats]] = ContextVar("request_db_stats", default=None)
+
+def route_template(scope: Scope) -> str:
+    """The path template of the route a request will be dispatched to"""
+    partial = None
+    for route in scope["app"].router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            # Path matched but not the method (405)
+            partial = route.path
+    return partial or UNMATCHED_ROUTE
+
+class MetricsMiddleware:
+    """Records latency, status and SQL usage per route template
+
+    A plain ASGI middleware rather than BaseHTTPMiddleware, so the handler
+    runs in this task and streamed bodies are included in the latency.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = route_template(scope)
+        status = 500
+        db_stats = RequestDBStats()
+        token = _request_db_stats.set(db_stats)
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_progress = HTTP_IN_PROGRESS.labels(method, route)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_LATENCY.labels(method, route).observe(time.perf_counter() - started)
+            in_progress.dec()
+            HTTP_REQUESTS.labels(method, route, str(status)).inc()
+            DB_QUERIES_PER_REQUEST.labels(route).observe(db_stats.queries)
+            DB_TIME_PER_REQUEST.labels(route).observe(db_stats.seconds)
+            _request_db_stats.reset(token)
+
+def _statement_kind(statement: str) -> str:
+    keyword = statement.lstrip().split(None, 1)[:1]
+    kind = keyword[0].upper() if keyword else ""
+    return kind if kind in ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH") else "OTHER"
+
+def instrument_engine(engine) -> None:
+    """Time every statement run on `engine` (an AsyncEngine or Engine)"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._metrics_started
+        DB_QUERY_LATENCY.labels(_statement_kind(statement)).observe(elapsed)
+        stats = _request_db_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.seconds += elapsed
+
+    _pools.append(sync_engine)
+
+_pools: List[Any] = []
+_caches: Dict[str, Any] = {}
+_gauges: Dict[str, Callable[[], Dict[str, float]]] = {}
+
+def track_cache(name: str, cache: Any) -> None:
+    """Export the `hits` and `misses` counters of `cache` under `name`"""
+    _caches[name] = cache
+
+def track_gauges(name: str, read: Callable[[], Dict[str, float]]) -> None:
+    """Export each value returned by `read()` as promptify_<name>_<key>"""
+    _gauges[name] = read
+
+class _StatsCollector:
+    """Reads pool and cache state when /metrics is scraped"""
+
+    def collect(self) -> Iterator[Any]:
+        pool_metrics = {
+            "size": GaugeMetricFamily("promptify_db_pool_size", "Connections the pool keeps open", labels=["engine"]),
+            "checkedout": GaugeMetricFamily("promptify_db_pool_checked_out", "Connections in use", labels=["engine"]),
+            "checkedin": GaugeMetricFamily("promptify_db_pool_checked_in", "Idle connections in the pool", labels=["engine"]),
+            "overflow": GaugeMetricFamily("promptify_db_pool_overflow", "Connections opened beyond pool_size", labels=["engine"]),
+        }
+        for engine in _pools:
+            for method, family in pool_metrics.items():
+                # SQLite's pools don't report every figure
+                read = getattr(engine.pool, method, None)
+                if callable(read):
+                    # overflow() counts up from -pool_size until the pool is full
+                    value = max(read(), 0) if method == "overflow" else read()
+                    family.add_metric([engine.url.get_backend_name()], value)
+        yield from (family for family in pool_metrics.values() if family.samples)
+
+        hits = CounterMetricFamily("promptify_cache_hits", "Cache lookups that found an entry", labels=["cache"])
+        misses = CounterMetricFamily("promptify_cache_misses", "Cache lookups that found nothing", labels=["cache"])
+        for name, cache in _caches.items():
+            hits.add_metric([name], cache.hits)
+            misses.add_metric([name], cache.misses)
+        yield hits
+        yield misses
+
+        for name, read in _gauges.items():
+            for key, value in read().items():
+                yield GaugeMetricFamily(f"promptify_{name}_{key}", f"{name} {key.replace('_', ' ')}", value=value)
+
+REGISTRY.register(_StatsCollector())
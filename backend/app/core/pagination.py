@@ -0,0 +1,71 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+from fastapi import HTTPException, Request, Response
+from sqlalchemy import tuple_
+from sqlalchemy.sql import Select
+from .config import settings
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_position(*values: Any) -> str:
+    """Opaque cursor for a keyset position of JSON-encodable values"""
+    raw = json.dumps(list(values)).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_position(cursor: str) -> List[Any]:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+def encode_cursor(created_at: datetime, id: str) -> str:
+    """Opaque cursor for the keyset position (created_at, id)"""
+    return encode_position(created_at.isoformat(), id)
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        created_at, id = decode_position(cursor)
+        return datetime.fromisoformat(created_at), str(id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def page_size(limit: Optional[int]) -> int:
+    """Requested page size clamped to the configured bounds"""
+    return max(1, min(limit or settings.PAGE_SIZE_DEFAULT, settings.PAGE_SIZE_MAX))
+
+def after_cursor(query: Select, created_col: Any, id_col: Any, cursor: Optional[str], descending: bool = True) -> Select:
+    """Order by (created_at, id) and continue strictly after `cursor`"""
+    if cursor:
+        position = tuple_(created_col, id_col)
+        after = tuple_(*decode_cursor(cursor))
+        query = query.where(position < after if descending else position > after)
+    if descending:
+        return query.order_by(created_col.desc(), id_col.desc())
+    return query.order_by(created_col, id_col)
+
+def paginate(query: Select, created_col: Any, id_col: Any, cursor: Optional[str], limit: int, descending: bool = True) -> Select:
+    """One page of `after_cursor`
+
+    One extra row is fetched so `finish_page` can tell whether another page
+    exists without a separate count query.
+    """
+    return after_cursor(query, created_col, id_col, cursor, descending).limit(limit + 1)
+
+def finish_page(
+    rows: Sequence[Any], limit: int, request: Request, response: Response,
+    cursor_for: Optional[Callable[[Any], str]] = None
+) -> List[Any]:
+    """Trim the look-ahead row and advertise the next page in the response headers"""
+    rows = list(rows)
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        cursor = cursor_for(last) if cursor_for else encode_cursor(last.created_at, last.id)
+        response.headers[NEXT_CURSOR_HEADER] = cursor
+        response.headers["Link"] = f'<{request.url.include_query_params(cursor=cursor)}>; rel="next"'
+    return rows
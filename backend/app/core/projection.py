@@ -0,0 +1,28 @@
+from typing import Any, Iterable, List, Optional
+from fastapi import HTTPException
+from sqlalchemy.orm import load_only
+
+# Fields every projection keeps, since pagination cursors are built from them
+REQUIRED_FIELDS = ("id", "created_at")
+
+def parse_fields(fields: Optional[str], available: Iterable[str]) -> List[str]:
+    """Fields named in a comma-separated `fields` parameter, in response order
+
+    An empty parameter selects everything; unknown names are rejected.
+    """
+    available = list(available)
+    if not fields:
+        return available
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = sorted(requested.difference(available))
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}; available: {', '.join(available)}"
+        )
+    return [field for field in available if field in requested or field in REQUIRED_FIELDS]
+
+def load_columns(model: Any, fields: Iterable[str]):
+    """Loader option fetching only the table columns among `fields`"""
+    columns = model.__table__.columns
+    return load_only(*(getattr(model, field) for field in fields if field in columns))
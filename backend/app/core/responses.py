@@ -0,0 +1,17 @@
+from typing import Any, Optional
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+
+def json_response(content: Any, response: Optional[Response] = None, status_code: int = 200) -> ORJSONResponse:
+    """Encode handler output straight to JSON with orjson
+
+    The endpoint converters already build dicts in the shape of their
+    response models, so returning a Response skips FastAPI's second
+    validation and encoding pass; the models stay on the routes for the
+    OpenAPI schema. Datetimes are encoded natively as ISO 8601. Headers set
+    on the injected `response` (pagination cursors) are carried over.
+    """
+    headers = None
+    if response is not None:
+        headers = {key: value for key, value in response.headers.items() if key != "content-length"}
+    return ORJSONResponse(content, status_code=status_code, headers=headers)
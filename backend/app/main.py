@@ -1,26 +1,108 @@
-from fastapi import FastAPI
+import time
+
+# Taken before the app's imports so the startup report covers them
+_import_started = time.perf_counter()
+
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from sqlalchemy import text
+from typing import Awaitable, Dict, Optional
+import asyncio
 import os
 
 from app.api.v1.api import api_router
+from app.api.v1.endpoints.analyze import SIMILARITY_HEADER
 from app.core.config import settings
-from app.core.database import create_tables
+from app.core.database import create_tables, dispose_engine, find_missing_indexes, get_engine
+from app.core.metrics import MetricsMiddleware, track_cache, track_gauges
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.responses import json_response
+from app.services.analysis_cache import analysis_cache
+from app.services.entity_cache import entity_cache
+from app.services.openai_service import (
+    close_openai_service, current_openai_service, get_openai_service, prepare_openai_service
+)
+from app.services.similarity import similarity_index
+from app.services.text_analysis import text_analyzer
 
 # Load environment variables
 load_dotenv()
 
-# Create database tables
-create_tables()
-
 PORT = os.getenv("PORT", 8000)
 
+SCHEDULER_GAUGES = ("queue_depth", "requests_in_window", "tokens_in_window")
+
+async def _timed(name: str, step: Awaitable, timeout: Optional[float] = None) -> str:
+    """Run a startup step, reporting rather than raising its failure"""
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(step, timeout)
+    except asyncio.TimeoutError:
+        print(f"WARNING: {name} did not finish within {timeout}s")
+    except Exception as e:
+        print(f"WARNING: {name} failed: {e}")
+    return f"{name} {time.perf_counter() - started:.2f}s"
+
+async def _check_schema():
+    # Report schema drift instead of silently running sequential scans
+    missing = await find_missing_indexes()
+    if missing:
+        print(f"WARNING: database schema is missing {', '.join(missing)}; run `alembic upgrade head`")
+
+async def _warm_up_database() -> str:
+    # One step at a time, so warm-up holds a single connection
+    if settings.DB_CHECK_SCHEMA:
+        timings = [await _timed("schema check", _check_schema(), settings.STARTUP_DB_TIMEOUT)]
+    else:
+        # Load the driver and open the first pooled connection
+        timings = [await _timed("database connection", _ping_database(), settings.STARTUP_DB_TIMEOUT)]
+    if similarity_index.enabled:
+        # Otherwise the first project analysis would wait for it
+        timings.append(await _timed("similarity index", similarity_index.load(), settings.STARTUP_DB_TIMEOUT))
+    return ", ".join(timings)
+
+async def _warm_up():
+    """Startup work that requests don't have to wait for, run concurrently"""
+    started = time.perf_counter()
+    timings = await asyncio.gather(_timed("OpenAI client", prepare_openai_service()), _warm_up_database())
+    print(f"Warm-up finished in {time.perf_counter() - started:.2f}s ({', '.join(timings)})")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    started = time.perf_counter()
+    # Requests need the tables, so only this waits; a slow database is
+    # reported and left to /health/ready instead of failing the boot
+    if settings.DB_CREATE_TABLES:
+        await _timed("table creation", create_tables(), settings.STARTUP_DB_TIMEOUT)
+    app.state.warmup = asyncio.create_task(_warm_up())
+    
+    finished = time.perf_counter()
+    total = finished - _import_started
+    print(
+        f"Startup took {total:.2f}s (imports {started - _import_started:.2f}s, "
+        f"lifespan {finished - started:.2f}s); budget {settings.STARTUP_BUDGET:.2f}s"
+    )
+    if total > settings.STARTUP_BUDGET:
+        print(f"WARNING: startup exceeded its {settings.STARTUP_BUDGET:.2f}s budget by {total - settings.STARTUP_BUDGET:.2f}s")
+    
+    yield
+    
+    app.state.warmup.cancel()
+    await close_openai_service()
+    text_analyzer.shutdown()
+    await entity_cache.close()
+    await dispose_engine()
+
 app = FastAPI(
     title="Promptify API",
     description="Backend API for Promptify application",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Set up CORS
@@ -30,8 +112,25 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, SIMILARITY_HEADER, "ETag"],
 )
 
+def _scheduler_gauges() -> Dict[str, float]:
+    # A scrape must not create the client (and import openai) itself
+    openai_service = current_openai_service()
+    if openai_service is None:
+        return dict.fromkeys(SCHEDULER_GAUGES, 0)
+    stats = openai_service.scheduler.stats()
+    return {key: stats[key] for key in SCHEDULER_GAUGES}
+
+# Added last so it wraps everything else, including CORS
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    track_cache("analysis", analysis_cache.memory)
+    track_cache("entity", entity_cache)
+    if settings.OPENAI_API_KEY:
+        track_gauges("openai_scheduler", _scheduler_gauges)
+
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
 
@@ -43,6 +142,61 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/health/cache")
+async def cache_stats():
+    """Hit ratio and invalidation counts of the entity cache"""
+    return entity_cache.stats()
+
+async def _ping_database():
+    # Checking out a connection counts too: an exhausted pool isn't ready
+    async with get_engine().connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+async def _check_database() -> Optional[str]:
+    try:
+        await asyncio.wait_for(_ping_database(), settings.READINESS_TIMEOUT)
+    except asyncio.TimeoutError:
+        return f"No answer within {settings.READINESS_TIMEOUT}s"
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+    return None
+
+@app.get("/health/ready")
+async def readiness_check():
+    """Whether this worker can serve traffic
+    
+    Answers 503 while startup warm-up is running and when the database is
+    unreachable. An unreachable OpenAI API only marks the worker degraded,
+    since analyses fall back to the offline rules.
+    """
+    warmup = getattr(app.state, "warmup", None)
+    if warmup is not None and not warmup.done():
+        return json_response({"status": "starting", "checks": {}}, status_code=503)
+    
+    openai_service = get_openai_service()
+    database_error, openai_error = await asyncio.gather(
+        _check_database(),
+        openai_service.check_upstream() if openai_service else asyncio.sleep(0)
+    )
+    checks = {
+        "database": database_error or "ok",
+        "openai": (openai_error or "ok") if openai_service else "disabled"
+    }
+    if database_error:
+        status, status_code = "unavailable", 503
+    elif openai_error or not openai_service:
+        status, status_code = "degraded", 200
+    else:
+        status, status_code = "ready", 200
+    return json_response({"status": status, "checks": checks}, status_code=status_code)
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus metrics for this worker"""
+        # CONTENT_TYPE_LATEST carries its own charset
+        return Response(generate_latest(), headers={"Content-Type": CONTENT_TYPE_LATEST})
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
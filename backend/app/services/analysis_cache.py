@@ -0,0 +1,144 @@
+import copy
+import hashlib
+import json
+import unicodedata
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional
+from sqlalchemy import select, delete
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, AnalysisCacheEntry
+
+# Bump when the analysis prompt changes so stale answers are not served
+PROMPT_VERSION = "1"
+
+# Trim the SQL tier back to its size bound once every this many writes
+_SQL_TRIM_INTERVAL = 100
+
+def normalize_idea(project_idea: str) -> str:
+    """Normalize idea text so trivially different submissions share a key"""
+    text = unicodedata.normalize("NFKC", project_idea).casefold()
+    return " ".join(text.split())
+
+class AnalysisCache:
+    """Content-addressed cache of successful project analyses
+
+    Lookups go to an in-process LRU first and, when enabled, to a shared SQL
+    table so every worker benefits from answers computed by the others.
+    """
+
+    def __init__(self):
+        self.enabled = settings.ANALYSIS_CACHE_ENABLED
+        self.ttl = settings.ANALYSIS_CACHE_TTL
+        self.memory = LRUCache(max_entries=settings.ANALYSIS_CACHE_MAX_ENTRIES, ttl=self.ttl)
+        self.sql_enabled = settings.ANALYSIS_CACHE_SQL
+        self.sql_hits = 0
+        self.sql_misses = 0
+        self.sql_errors = 0
+        self._sql_writes = 0
+
+    @staticmethod
+    def make_key(project_idea: str, language: str, **model_settings: Any) -> str:
+        """Hash of the normalized idea, language and every setting that shapes the answer"""
+        material = json.dumps(
+            {
+                "idea": normalize_idea(project_idea),
+                "language": language.strip().lower(),
+                "prompt_version": PROMPT_VERSION,
+                **model_settings
+            },
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+
+        result = self.memory.get(key)
+        if result is None and self.sql_enabled:
+            result = await self._sql_get(key)
+            if result is not None:
+                self.memory.set(key, result)
+
+        return copy.deepcopy(result) if result is not None else None
+
+    async def set(self, key: str, result: Dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+
+        self.memory.set(key, copy.deepcopy(result))
+        if self.sql_enabled:
+            await self._sql_set(key, result)
+
+    def clear(self) -> None:
+        self.memory.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {
+            "enabled": self.enabled,
+            "ttl": self.ttl,
+            "memory": self.memory.stats()
+        }
+        if self.sql_enabled:
+            stats["sql"] = {
+                "hits": self.sql_hits,
+                "misses": self.sql_misses,
+                "errors": self.sql_errors
+            }
+        return stats
+
+    async def _sql_get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            async with AsyncSessionLocal() as db:
+                payload = await db.scalar(
+                    select(AnalysisCacheEntry.payload).where(
+                        AnalysisCacheEntry.key == key,
+                        AnalysisCacheEntry.expires_at > datetime.utcnow()
+                    )
+                )
+        except Exception as e:
+            # The shared tier is an optimization; never fail the request over it
+            print(f"Analysis cache read error: {e}")
+            self.sql_errors += 1
+            return None
+        
+        if payload is None:
+            self.sql_misses += 1
+            return None
+        self.sql_hits += 1
+        return json.loads(payload)
+
+    async def _sql_set(self, key: str, result: Dict[str, Any]) -> None:
+        try:
+            async with AsyncSessionLocal() as db:
+                now = datetime.utcnow()
+                await db.merge(AnalysisCacheEntry(
+                    key=key,
+                    payload=json.dumps(result),
+                    created_at=now,
+                    expires_at=now + timedelta(seconds=self.ttl)
+                ))
+                self._sql_writes += 1
+                if self._sql_writes % _SQL_TRIM_INTERVAL == 0:
+                    await self._sql_trim(db, now)
+                await db.commit()
+        except Exception as e:
+            print(f"Analysis cache write error: {e}")
+            self.sql_errors += 1
+
+    async def _sql_trim(self, db, now: datetime) -> None:
+        """Drop expired rows, then the oldest rows beyond the size bound"""
+        await db.execute(delete(AnalysisCacheEntry).where(AnalysisCacheEntry.expires_at <= now))
+        cutoff = await db.scalar(
+            select(AnalysisCacheEntry.created_at)
+            .order_by(AnalysisCacheEntry.created_at.desc())
+            .offset(settings.ANALYSIS_CACHE_SQL_MAX_ENTRIES)
+            .limit(1)
+        )
+        if cutoff is not None:
+            await db.execute(delete(AnalysisCacheEntry).where(AnalysisCacheEntry.created_at <= cutoff))
+
+# Create a singleton instance
+analysis_cache = AnalysisCache()
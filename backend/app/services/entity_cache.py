@@ -0,0 +1,255 @@
+import uuid
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+import orjson
+from fastapi import Request, Response
+from app.core.cache import LRUCache
+from app.core.concurrency import SingleFlight
+from app.core.conditional import check_conditional
+from app.core.config import settings
+from app.core.responses import json_response
+
+# Validators of a representation: (ETag, Last-Modified or None)
+Validators = Tuple[str, Optional[datetime]]
+
+def idea_namespace(idea_id: str) -> str:
+    """An idea, its comments and every variant of either"""
+    return f"idea:{idea_id}"
+
+def prompt_namespace(prompt_id: str) -> str:
+    return f"prompt:{prompt_id}"
+
+def session_ideas_namespace(session: str) -> str:
+    """Every page of a session's idea listing"""
+    return f"ideas:session:{session}"
+
+def session_prompts_namespace(session: str) -> str:
+    return f"prompts:session:{session}"
+
+def _new_generation() -> str:
+    return uuid.uuid4().hex[:16]
+
+class MemoryBackend:
+    """In-process LRU with TTL; invalidations only reach this worker
+
+    Other workers and instances keep serving what they cached until the TTL
+    expires, so this is only used when ENTITY_CACHE_IN_PROCESS says the app
+    runs as a single process.
+    """
+
+    name = "memory"
+
+    def __init__(self, max_entries: int, ttl: int):
+        self.values = LRUCache(max_entries=max_entries, ttl=ttl)
+        self.generations = LRUCache(max_entries=max_entries)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self.values.get(key)
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        self.values.set(key, value)
+
+    async def generation(self, namespace: str) -> str:
+        token = self.generations.get(namespace)
+        if token is None:
+            token = _new_generation()
+            self.generations.set(namespace, token)
+        return token
+
+    async def bump(self, namespaces: Iterable[str]) -> None:
+        for namespace in namespaces:
+            self.generations.set(namespace, _new_generation())
+
+    async def close(self) -> None:
+        pass
+
+class RedisBackend:
+    """Redis (or a compatible server) shared by every worker
+
+    Needs the optional `redis` package. Entries are stored as JSON with the
+    cache TTL; generation tokens live longer than any entry under them.
+    """
+
+    name = "redis"
+    PREFIX = "promptify:entity:"
+    GENERATION_TTL = 86400
+
+    def __init__(self, url: str, ttl: int):
+        import redis.asyncio as redis
+        self.client = redis.from_url(url)
+        self.ttl = ttl
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        raw = await self.client.get(self.PREFIX + key)
+        return orjson.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        await self.client.set(self.PREFIX + key, orjson.dumps(value), ex=self.ttl)
+
+    async def generation(self, namespace: str) -> str:
+        key = f"{self.PREFIX}gen:{namespace}"
+        token = await self.client.get(key)
+        if token is None:
+            # NX so concurrent workers settle on one token
+            await self.client.set(key, _new_generation(), nx=True, ex=self.GENERATION_TTL)
+            token = await self.client.get(key)
+        return token.decode("ascii")
+
+    async def bump(self, namespaces: Iterable[str]) -> None:
+        async with self.client.pipeline(transaction=False) as pipe:
+            for namespace in namespaces:
+                pipe.set(f"{self.PREFIX}gen:{namespace}", _new_generation(), ex=self.GENERATION_TTL)
+            await pipe.execute()
+
+    async def close(self) -> None:
+        await self.client.close()
+
+class EntityCache:
+    """Read-through cache of rendered entities and per-session listings
+
+    Entries live under a namespace (an idea, a prompt, a session's listing)
+    whose generation token is part of every key, so a write invalidates all
+    variants of a namespace (query parameters, pages) at once by replacing
+    the token; orphaned entries age out. Each entry holds the response body
+    with its validators, so a hit answers both plain and conditional GETs
+    without touching the database. Concurrent misses for one key share a
+    single load.
+    """
+
+    def __init__(self):
+        self.ttl = settings.ENTITY_CACHE_TTL
+        self.backend = self._create_backend() if settings.ENTITY_CACHE_ENABLED else None
+        self.enabled = self.backend is not None
+        self.inflight = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    def _create_backend(self):
+        if settings.ENTITY_CACHE_REDIS_URL:
+            try:
+                return RedisBackend(settings.ENTITY_CACHE_REDIS_URL, self.ttl)
+            except ImportError:
+                print("ENTITY_CACHE_REDIS_URL is set but the redis package is not installed")
+        if settings.ENTITY_CACHE_IN_PROCESS:
+            return MemoryBackend(settings.ENTITY_CACHE_MAX_ENTRIES, self.ttl)
+        # Without a shared backend, writes on one worker would leave the
+        # others serving stale entities
+        return None
+
+    async def read(
+        self,
+        request: Request,
+        response: Response,
+        namespace: Optional[str],
+        validators: Callable[[], Awaitable[Optional[Validators]]],
+        load: Callable[[Response], Awaitable[Any]]
+    ) -> Optional[Response]:
+        """Serve a GET from the cache, or validate and load it on a miss
+
+        `validators` is the cheap query behind conditional GETs and returns
+        None when the entity does not exist, in which case so does this.
+        `load` builds the body and may set headers (pagination) on the
+        response it is given. Without a namespace nothing is cached.
+        """
+        key = await self._key(namespace, str(request.url)) if namespace and self.enabled else None
+        entry = await self._get(key) if key else None
+
+        if entry is None:
+            validated = await validators()
+            if validated is None:
+                return None
+            etag, last_modified = validated
+            not_modified = check_conditional(request, response, etag, last_modified)
+            if not_modified:
+                return not_modified
+            entry = await self._fill(key, etag, last_modified, load)
+        else:
+            last_modified = entry["last_modified"]
+            not_modified = check_conditional(
+                request, response, entry["etag"], datetime.fromisoformat(last_modified) if last_modified else None
+            )
+            if not_modified:
+                return not_modified
+
+        for name, value in entry["headers"].items():
+            response.headers[name] = value
+        return json_response(entry["content"], response)
+
+    async def invalidate(self, *namespaces: str) -> None:
+        """Drop every cached variant under `namespaces`; call after commit"""
+        if not self.enabled or not namespaces:
+            return
+        try:
+            await self.backend.bump(set(namespaces))
+            self.invalidations += len(namespaces)
+        except Exception as e:
+            print(f"Entity cache invalidation error: {e}")
+            self.errors += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "backend": self.backend.name if self.backend else None,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+            "inflight": self.inflight.stats()
+        }
+
+    async def close(self) -> None:
+        if self.backend is not None:
+            await self.backend.close()
+
+    async def _key(self, namespace: str, variant: str) -> Optional[str]:
+        # Read before the database, so a write landing mid-load leaves its entry orphaned
+        try:
+            return f"{namespace}@{await self.backend.generation(namespace)}:{variant}"
+        except Exception as e:
+            # The cache is an optimization; never fail the request over it
+            print(f"Entity cache error: {e}")
+            self.errors += 1
+            return None
+
+    async def _get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            entry = await self.backend.get(key)
+        except Exception as e:
+            print(f"Entity cache read error: {e}")
+            self.errors += 1
+            return None
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    async def _fill(
+        self, key: Optional[str], etag: str, last_modified: Optional[datetime], load: Callable[[Response], Awaitable[Any]]
+    ) -> Dict[str, Any]:
+        async def build() -> Dict[str, Any]:
+            scratch = Response()
+            content = await load(scratch)
+            entry = {
+                "content": content,
+                "etag": etag,
+                "last_modified": last_modified.isoformat() if last_modified else None,
+                "headers": {name: value for name, value in scratch.headers.items() if name != "content-length"}
+            }
+            if key:
+                try:
+                    await self.backend.set(key, entry)
+                except Exception as e:
+                    print(f"Entity cache write error: {e}")
+                    self.errors += 1
+            return entry
+
+        return await self.inflight.do(key, build) if key else await build()
+
+# Create a singleton instance
+entity_cache = EntityCache()
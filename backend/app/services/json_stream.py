@@ -0,0 +1,112 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+_WHITESPACE = " \t\r\n"
+
+class JSONSectionParser:
+    """Incremental parser for a JSON object arriving in arbitrary chunks
+
+    Text before the opening brace is ignored. Each top-level member is decoded
+    and returned from `feed` as soon as its value is complete, without waiting
+    for the rest of the document; every character is scanned exactly once.
+    """
+
+    def __init__(self):
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._started = False
+        self._key_start: Optional[int] = None
+        self._key: Optional[str] = None
+        self._value_start: Optional[int] = None
+        self.sections: Dict[str, Any] = {}
+        self.complete = False
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Consume a chunk and return the (key, value) members it completed"""
+        if self.complete or not chunk:
+            return []
+
+        self._text += chunk
+        completed = []
+        text = self._text
+        pos = self._pos
+        end = len(text)
+
+        while pos < end and not self.complete:
+            char = text[pos]
+
+            if not self._started:
+                if char == "{":
+                    self._started = True
+                    self._depth = 1
+                pos += 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        if self._key is None:
+                            self._key = json.loads(text[self._key_start:pos + 1])
+                        else:
+                            # A top-level string value just closed
+                            self._emit(text, pos + 1, completed)
+                pos += 1
+                continue
+
+            if char == '"':
+                self._in_string = True
+                if self._depth == 1:
+                    if self._key is None:
+                        self._key_start = pos
+                    elif self._value_start is None:
+                        self._value_start = pos
+            elif char in "{[":
+                if self._depth == 1 and self._value_start is None:
+                    self._value_start = pos
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 1 and self._value_start is not None:
+                    # A top-level object or array value just closed
+                    self._emit(text, pos + 1, completed)
+                elif self._depth == 0:
+                    if self._value_start is not None:
+                        self._emit(text, pos, completed)
+                    self.complete = True
+            elif self._depth == 1:
+                if char == ",":
+                    if self._value_start is not None:
+                        self._emit(text, pos, completed)
+                elif char != ":" and char not in _WHITESPACE and self._key is not None and self._value_start is None:
+                    # Start of a bare scalar (number, true, false, null)
+                    self._value_start = pos
+            pos += 1
+
+        self._pos = pos
+        return completed
+
+    def result(self) -> Optional[Dict[str, Any]]:
+        """The decoded object once its closing brace has been seen"""
+        return self.sections if self.complete else None
+
+    def _emit(self, text: str, stop: int, completed: List[Tuple[str, Any]]) -> None:
+        value = json.loads(text[self._value_start:stop])
+        self.sections[self._key] = value
+        completed.append((self._key, value))
+        self._key = None
+        self._key_start = None
+        self._value_start = None
+
+def parse_json_object(content: str) -> Optional[Dict[str, Any]]:
+    """Decode the first complete JSON object embedded in `content`"""
+    parser = JSONSectionParser()
+    parser.feed(content)
+    return parser.result()
@@ -1,17 +1,123 @@
+import asyncio
+import copy
+import importlib
 import json
-from typing import Dict, Any, Optional
-from openai import OpenAI
+import time
+from typing import TYPE_CHECKING, Dict, Any, Optional, List, Tuple, AsyncIterator
+from app.core.concurrency import SingleFlight
 from app.core.config import settings
+from app.core.metrics import ANALYSIS_RESULTS, OPENAI_LATENCY, OPENAI_TOKENS
+from app.services.analysis_cache import analysis_cache
+from app.services.json_stream import JSONSectionParser, parse_json_object
+from app.services.rate_limiter import Grant, RateLimitScheduler, backoff_delay, estimate_tokens
+from app.services.similarity import similarity_index
+
+if TYPE_CHECKING:
+    from openai import APIStatusError
 
 class OpenAIService:
+    TEMPERATURE = 0.7
+    MAX_TOKENS = 2000
+    RESULT_KEYS = ("detectedStack", "recommendedTool", "devStructure", "infraTools", "generatedPrompt", "reasoning")
+    
     def __init__(self):
         if not settings.OPENAI_API_KEY:
             raise ValueError("OPENAI_API_KEY is not set in environment variables")
         
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        # The client library takes longer to import than the rest of the app
+        import httpx
+        from openai import AsyncOpenAI
+        
+        # One pooled HTTP transport shared by every request on this worker, so
+        # concurrent analyses reuse keep-alive connections instead of blocking
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS
+            ),
+            timeout=httpx.Timeout(settings.OPENAI_TIMEOUT, connect=settings.OPENAI_CONNECT_TIMEOUT)
+        )
+        self.client = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_BASE_URL,
+            http_client=self.http_client,
+            timeout=settings.OPENAI_TIMEOUT,
+            # Retries go through the scheduler so they respect the budgets
+            max_retries=0
+        )
+        # Identical analyses requested concurrently share one upstream call
+        self.inflight = SingleFlight()
+        self.scheduler = RateLimitScheduler(
+            rpm_limit=settings.OPENAI_RPM_LIMIT,
+            tpm_limit=settings.OPENAI_TPM_LIMIT
+        )
+        # Last upstream probe as (monotonic time, error or None)
+        self._upstream_check: Optional[Tuple[float, Optional[str]]] = None
+    
+    async def close(self):
+        """Release the pooled HTTP connections"""
+        await self.client.close()
+    
+    async def check_upstream(self) -> Optional[str]:
+        """Why the OpenAI API is unusable, or None when it answers
+        
+        Looks up the configured model, which costs no tokens. The result is
+        reused for READINESS_UPSTREAM_INTERVAL seconds so frequent readiness
+        probes don't spend the request budget.
+        """
+        now = time.monotonic()
+        if self._upstream_check and now - self._upstream_check[0] < settings.READINESS_UPSTREAM_INTERVAL:
+            return self._upstream_check[1]
+        try:
+            await self.client.models.retrieve(settings.OPENAI_MODEL, timeout=settings.READINESS_TIMEOUT)
+            error = None
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        self._upstream_check = (now, error)
+        return error
+    
+    def cache_key(self, project_idea: str, language: str = "en") -> str:
+        """Cache key covering the idea and every model setting that shapes the answer"""
+        return analysis_cache.make_key(
+            project_idea,
+            language,
+            model=settings.OPENAI_MODEL,
+            temperature=self.TEMPERATURE,
+            max_tokens=self.MAX_TOKENS
+        )
+    
+    async def analyze_project(self, project_idea: str, language: str = "en", timeout: Optional[float] = None, user_session: Optional[str] = None) -> Dict[str, Any]:
+        """Analyze project idea using OpenAI GPT-4
+        
+        The call is awaited on the shared async client, so it never blocks the
+        event loop. Cancelling the awaiting task aborts the upstream request.
+        Successful analyses are cached; fallback responses never are.
+        Concurrent identical requests await a single upstream call.
+        """
+        key = self.cache_key(project_idea, language)
+        cached = await analysis_cache.get(key)
+        if cached is not None:
+            ANALYSIS_RESULTS.labels("cache").inc()
+            return cached
+        
+        result = await self.inflight.do(key, lambda: self._analyze_and_cache(key, project_idea, language, timeout, user_session))
+        if result is None:
+            ANALYSIS_RESULTS.labels("fallback").inc()
+            return self._get_fallback_response(project_idea)
+        
+        ANALYSIS_RESULTS.labels("openai").inc()
+        # Every coalesced caller gets its own copy of the shared result
+        return copy.deepcopy(result)
+    
+    async def _analyze_and_cache(self, key: str, project_idea: str, language: str, timeout: Optional[float] = None, user_session: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        result = await self._request_analysis(project_idea, timeout, user_session)
+        if result is not None:
+            await analysis_cache.set(key, result)
+            similarity_index.add(project_idea, result, language)
+        return result
     
-    async def analyze_project(self, project_idea: str, language: str = "en") -> Dict[str, Any]:
-        """Analyze project idea using OpenAI GPT-4"""
+    def _build_messages(self, project_idea: str) -> List[Dict[str, str]]:
+        """Chat messages asking the model for a JSON project analysis"""
         
         prompt = f"""
         You are a software development expert. Please analyze the following project idea and provide recommendations:
@@ -78,44 +184,160 @@ class OpenAIService:
         }}
         """
         
+        return [
+            {
+                "role": "system",
+                "content": "You are a software development expert who provides detailed project analysis and recommendations."
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+    
+    def _validate_result(self, result: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if not isinstance(result, dict) or any(k not in result for k in self.RESULT_KEYS):
+            return None
+        return result
+    
+    async def _create_completion(self, messages: List[Dict[str, str]], user_session: Optional[str], timeout: Optional[float], **kwargs: Any) -> Tuple[Any, Grant]:
+        """Create a chat completion once the scheduler admits it
+        
+        429s, 5xx responses and connection errors are retried with
+        exponential backoff and jitter; each attempt is admitted separately.
+        """
+        from openai import APIConnectionError, APIStatusError, APITimeoutError, RateLimitError
+        
+        estimated_tokens = estimate_tokens(messages) + self.MAX_TOKENS
+        operation = "stream" if kwargs.get("stream") else "complete"
+        attempt = 0
+        while True:
+            grant = await self.scheduler.acquire(user_session, estimated_tokens)
+            retry_after = None
+            outcome = "error"
+            started = time.perf_counter()
+            try:
+                response = await self.client.chat.completions.create(
+                    model=settings.OPENAI_MODEL,
+                    messages=messages,
+                    temperature=self.TEMPERATURE,
+                    max_tokens=self.MAX_TOKENS,
+                    timeout=timeout or settings.OPENAI_TIMEOUT,
+                    **kwargs
+                )
+                outcome = "ok"
+                self.scheduler.on_success()
+                return response, grant
+            except RateLimitError as e:
+                outcome = "rate_limited"
+                retry_after = _retry_after(e)
+                self.scheduler.on_rate_limited(retry_after)
+                error = e
+            except APIStatusError as e:
+                outcome = "server_error" if e.status_code >= 500 else "client_error"
+                if e.status_code < 500:
+                    raise
+                error = e
+            except APITimeoutError:
+                outcome = "timeout"
+                # The per-call timeout is the caller's budget; don't multiply it
+                raise
+            except APIConnectionError as e:
+                outcome = "connection_error"
+                error = e
+            finally:
+                OPENAI_LATENCY.labels(operation, outcome).observe(time.perf_counter() - started)
+            
+            if attempt >= settings.OPENAI_MAX_RETRIES:
+                raise error
+            self.scheduler.on_retry()
+            await asyncio.sleep(backoff_delay(attempt, settings.OPENAI_BACKOFF_BASE, settings.OPENAI_BACKOFF_MAX, retry_after))
+            attempt += 1
+    
+    async def _request_analysis(self, project_idea: str, timeout: Optional[float] = None, user_session: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Call the model and parse its JSON answer, returning None on any failure"""
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a software development expert who provides detailed project analysis and recommendations."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.7,
-                max_tokens=2000
-            )
+            response, grant = await self._create_completion(self._build_messages(project_idea), user_session, timeout)
+            if response.usage is not None:
+                self.scheduler.record_usage(grant, response.usage.total_tokens)
+                OPENAI_TOKENS.labels("prompt").inc(response.usage.prompt_tokens)
+                OPENAI_TOKENS.labels("completion").inc(response.usage.completion_tokens)
             
             # Parse the JSON response
             content = response.choices[0].message.content
             
             # Try to extract JSON from the response
             try:
-                # Find JSON content between curly braces
-                start_idx = content.find('{')
-                end_idx = content.rfind('}') + 1
-                json_content = content[start_idx:end_idx]
-                
-                result = json.loads(json_content)
-                return result
+                return self._validate_result(parse_json_object(content or ""))
                 
-            except (json.JSONDecodeError, ValueError) as e:
-                # If JSON parsing fails, return a fallback response
-                return self._get_fallback_response(project_idea)
+            except (json.JSONDecodeError, ValueError):
+                # If JSON parsing fails, the caller falls back
+                return None
                 
         except Exception as e:
             print(f"OpenAI API error: {e}")
-            # Return fallback response on API error
-            return self._get_fallback_response(project_idea)
+            # The caller returns the fallback response on API error
+            return None
+    
+    async def stream_analysis(self, project_idea: str, language: str = "en", timeout: Optional[float] = None, user_session: Optional[str] = None) -> AsyncIterator[Tuple[str, Any]]:
+        """Stream a project analysis as ("token" | "section" | "error" | "done", data) events
+        
+        Tokens are forwarded as they arrive and each top-level section is
+        emitted as soon as its JSON value is complete. The final "done" event
+        carries the full analysis (or the fallback response on failure).
+        """
+        key = self.cache_key(project_idea, language)
+        cached = await analysis_cache.get(key)
+        if cached is not None:
+            ANALYSIS_RESULTS.labels("cache").inc()
+            for name, value in cached.items():
+                yield "section", {"name": name, "data": value}
+            yield "done", {"result": cached, "cached": True, "fallback": False}
+            return
+        
+        parser = JSONSectionParser()
+        messages = self._build_messages(project_idea)
+        stream = None
+        streamed_chars = 0
+        try:
+            stream, grant = await self._create_completion(messages, user_session, timeout, stream=True)
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                streamed_chars += len(delta)
+                yield "token", delta
+                for name, value in parser.feed(delta):
+                    yield "section", {"name": name, "data": value}
+            
+            # Streamed responses carry no usage block, so estimate it
+            prompt_tokens, completion_tokens = estimate_tokens(messages), streamed_chars // 4
+            self.scheduler.record_usage(grant, prompt_tokens + completion_tokens)
+            OPENAI_TOKENS.labels("prompt").inc(prompt_tokens)
+            OPENAI_TOKENS.labels("completion").inc(completion_tokens)
+            result = self._validate_result(parser.result())
+        except (json.JSONDecodeError, ValueError):
+            result = None
+        except Exception as e:
+            print(f"OpenAI API error: {e}")
+            yield "error", {"message": "Upstream analysis failed"}
+            result = None
+        finally:
+            if stream is not None:
+                # Abort the upstream generation if our client went away
+                await stream.response.aclose()
+        
+        if result is None:
+            ANALYSIS_RESULTS.labels("fallback").inc()
+            yield "done", {"result": self._get_fallback_response(project_idea), "cached": False, "fallback": True}
+            return
+        
+        ANALYSIS_RESULTS.labels("openai").inc()
+        await analysis_cache.set(key, result)
+        similarity_index.add(project_idea, result, language)
+        yield "done", {"result": result, "cached": False, "fallback": False}
     
     def _get_fallback_response(self, project_idea: str) -> Dict[str, Any]:
         """Fallback response when OpenAI API fails"""
@@ -152,5 +374,37 @@ class OpenAIService:
             "reasoning": "Based on modern web development best practices, this stack provides excellent developer experience and scalability."
         }
 
-# Create a singleton instance
-openai_service = OpenAIService() if settings.OPENAI_API_KEY else None 
\ No newline at end of file
+def _retry_after(error: "APIStatusError") -> Optional[float]:
+    """Seconds the upstream asked us to wait, if it said"""
+    try:
+        return float(error.response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+_service: Optional[OpenAIService] = None
+
+def get_openai_service() -> Optional[OpenAIService]:
+    """The shared service, created on first use; None without OPENAI_API_KEY"""
+    global _service
+    if _service is None and settings.OPENAI_API_KEY:
+        _service = OpenAIService()
+    return _service
+
+def current_openai_service() -> Optional[OpenAIService]:
+    """The shared service if it was already created, without creating it"""
+    return _service
+
+async def prepare_openai_service() -> None:
+    """Import the client library on a worker thread, then create the service
+    
+    Run in the background at startup so the first analysis doesn't pay for
+    the import and the event loop is not blocked by it.
+    """
+    if settings.OPENAI_API_KEY:
+        await asyncio.to_thread(importlib.import_module, "openai")
+        get_openai_service()
+
+async def close_openai_service() -> None:
+    """Release the client's connections, if it was ever created"""
+    if _service is not None:
+        await _service.close()
@@ -0,0 +1,167 @@
+import asyncio
+import random
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Optional
+
+WINDOW_SECONDS = 60.0
+
+def estimate_tokens(messages: Any) -> int:
+    """Rough prompt size: ~4 characters per token plus per-message overhead"""
+    return sum(len(message["content"]) // 4 + 4 for message in messages)
+
+def backoff_delay(attempt: int, base: float, cap: float, retry_after: Optional[float] = None) -> float:
+    """Exponential backoff with full jitter, never shorter than Retry-After"""
+    delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+class Grant:
+    """Permission for one upstream call, charged against the minute window"""
+
+    def __init__(self, tokens: int):
+        self.tokens = tokens
+        self.granted_at = 0.0
+
+class _Waiter:
+    def __init__(self, grant: Grant, future: "asyncio.Future[Grant]"):
+        self.grant = grant
+        self.future = future
+        self.enqueued_at = time.monotonic()
+
+class RateLimitScheduler:
+    """Admission control for OpenAI calls under requests/tokens-per-minute budgets
+
+    Waiting calls are queued per user session and served round-robin, so one
+    session submitting a burst cannot starve the others. The effective budget
+    shrinks multiplicatively when upstream answers 429 and recovers additively
+    on success, and dispatch pauses for any Retry-After the upstream asks for.
+    """
+
+    def __init__(self, rpm_limit: int, tpm_limit: int):
+        self.rpm_limit = rpm_limit
+        self.tpm_limit = tpm_limit
+        self.rate_scale = 1.0
+        self._window: Deque[Grant] = deque()
+        self._window_tokens = 0
+        self._queues: "OrderedDict[str, Deque[_Waiter]]" = OrderedDict()
+        self._cooldown_until = 0.0
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+        self.granted = 0
+        self.rate_limited = 0
+        self.retries = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    async def acquire(self, session: Optional[str], tokens: int) -> Grant:
+        """Wait until the call fits the budgets and it is this session's turn"""
+        session = session or "anonymous"
+        grant = Grant(tokens)
+        waiter = _Waiter(grant, asyncio.get_running_loop().create_future())
+        self._queues.setdefault(session, deque()).append(waiter)
+        self._pump()
+        try:
+            return await waiter.future
+        except asyncio.CancelledError:
+            # Cancelled or timed out: leave the queue, or give back a grant
+            # that arrived too late to be used
+            queue = self._queues.get(session)
+            if queue is not None and waiter in queue:
+                queue.remove(waiter)
+                if not queue:
+                    del self._queues[session]
+            elif grant in self._window:
+                self._window.remove(grant)
+                self._window_tokens -= grant.tokens
+            self._pump()
+            raise
+
+    def record_usage(self, grant: Grant, tokens: int) -> None:
+        """Replace a grant's estimate with the tokens the call actually used"""
+        if grant in self._window:
+            self._window_tokens += tokens - grant.tokens
+        grant.tokens = tokens
+        self._pump()
+
+    def on_success(self) -> None:
+        self.rate_scale = min(1.0, self.rate_scale + 0.05)
+
+    def on_rate_limited(self, retry_after: Optional[float] = None) -> None:
+        self.rate_limited += 1
+        self.rate_scale = max(0.1, self.rate_scale * 0.5)
+        if retry_after:
+            self._cooldown_until = max(self._cooldown_until, time.monotonic() + retry_after)
+
+    def on_retry(self) -> None:
+        self.retries += 1
+
+    def stats(self) -> Dict[str, Any]:
+        self._expire(time.monotonic())
+        return {
+            "queue_depth": sum(len(queue) for queue in self._queues.values()),
+            "waiting_sessions": len(self._queues),
+            "requests_in_window": len(self._window),
+            "tokens_in_window": self._window_tokens,
+            "rpm_limit": int(self.rpm_limit * self.rate_scale),
+            "tpm_limit": int(self.tpm_limit * self.rate_scale),
+            "granted": self.granted,
+            "rate_limited": self.rate_limited,
+            "retries": self.retries,
+            "avg_wait_seconds": self.total_wait / self.granted if self.granted else 0.0,
+            "max_wait_seconds": self.max_wait
+        }
+
+    def _expire(self, now: float) -> None:
+        while self._window and self._window[0].granted_at <= now - WINDOW_SECONDS:
+            self._window_tokens -= self._window.popleft().tokens
+
+    def _pump(self) -> None:
+        """Grant queued calls in round-robin session order while budget remains"""
+        now = time.monotonic()
+        self._expire(now)
+
+        while self._queues:
+            session, queue = next(iter(self._queues.items()))
+            waiter = queue[0]
+            retry_at = self._blocked_until(waiter.grant, now)
+            if retry_at is not None:
+                self._schedule(retry_at - now)
+                return
+
+            self._dequeue(session, queue)
+            waiter.grant.granted_at = now
+            self._window.append(waiter.grant)
+            self._window_tokens += waiter.grant.tokens
+            waited = now - waiter.enqueued_at
+            self.granted += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+            waiter.future.set_result(waiter.grant)
+
+    def _dequeue(self, session: str, queue: Deque[_Waiter]) -> None:
+        queue.popleft()
+        if queue:
+            self._queues.move_to_end(session)
+        else:
+            del self._queues[session]
+
+    def _blocked_until(self, grant: Grant, now: float) -> Optional[float]:
+        """When the next grant could fit, or None if it fits now"""
+        if now < self._cooldown_until:
+            return self._cooldown_until
+        if not self._window:
+            # An empty window always admits, even an oversized request
+            return None
+
+        rpm = max(1, int(self.rpm_limit * self.rate_scale))
+        tpm = max(1, int(self.tpm_limit * self.rate_scale))
+        if len(self._window) < rpm and self._window_tokens + grant.tokens <= tpm:
+            return None
+        return self._window[0].granted_at + WINDOW_SECONDS
+
+    def _schedule(self, delay: float) -> None:
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+        self._wakeup = asyncio.get_running_loop().call_later(max(delay, 0.01), self._pump)
@@ -0,0 +1,133 @@
+import json
+import os
+import re
+import time
+from typing import Any, Dict, Iterable, Optional, Set
+from app.core.config import settings
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """Regex alternation over `keywords` factored into a prefix trie
+
+    Greedy optional groups make the longest keyword at a position win, and
+    shared prefixes are only scanned once.
+    """
+    trie: Dict[str, Any] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, Any]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{pattern})?" if "" in node else pattern
+
+    return build(trie)
+
+class CompiledRules:
+    """A keyword rule table compiled into one regex
+
+    The table maps each choice (e.g. "frontend", "devStructure") to ordered
+    rules and a default. A rule matches when any keyword in `any` occurs in
+    the text, or every keyword in `all` does; the first matching rule's
+    `value` is chosen. Keywords match as case-insensitive substrings.
+
+    All keywords are found in one scan: a lookahead at each position reports
+    the longest keyword starting there, and every keyword contained in a
+    match is implied by it, so overlapping and nested keywords are found too.
+    """
+
+    def __init__(self, table: Dict[str, Any]):
+        self.choices: Dict[str, Dict[str, Any]] = {}
+        keywords: Set[str] = set()
+        for name, choice in table.items():
+            rules = []
+            for rule in choice.get("rules", []):
+                any_of = [keyword.casefold() for keyword in rule.get("any", [])]
+                all_of = [keyword.casefold() for keyword in rule.get("all", [])]
+                if not any_of and not all_of:
+                    raise ValueError(f"Rule for '{name}' has no keywords")
+                rules.append((frozenset(any_of), frozenset(all_of), rule["value"]))
+                keywords.update(any_of, all_of)
+            self.choices[name] = {"rules": rules, "default": choice["default"]}
+
+        self.keywords = keywords
+        self._implied = {
+            keyword: frozenset(other for other in keywords if other in keyword)
+            for keyword in keywords
+        }
+        self._pattern = re.compile(f"(?=({_trie_pattern(keywords)}))") if keywords else None
+
+    def match(self, text: str) -> Set[str]:
+        """Every keyword occurring in `text`"""
+        found: Set[str] = set()
+        if self._pattern is None:
+            return found
+        for keyword in {match.group(1) for match in self._pattern.finditer(text.casefold())}:
+            found.update(self._implied[keyword])
+        return found
+
+    def evaluate(self, text: str) -> Dict[str, Any]:
+        """The chosen value for every choice in the table"""
+        found = self.match(text)
+        result = {}
+        for name, choice in self.choices.items():
+            result[name] = choice["default"]
+            for any_of, all_of, value in choice["rules"]:
+                if (any_of and not any_of.isdisjoint(found)) or (all_of and all_of <= found):
+                    result[name] = value
+                    break
+        return result
+
+class RuleEngine:
+    """Rule table loaded from a JSON file and reloaded when the file changes
+
+    The file's modification time is checked at most every `check_interval`
+    seconds. A file that fails to load or compile is reported and the
+    previous rules stay in effect.
+    """
+
+    def __init__(self, path: str, check_interval: float = 1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self.rules: Optional[CompiledRules] = None
+        self.reloads = 0
+        self._mtime: Optional[int] = None
+        self._checked_at = 0.0
+        self.reload()
+
+    def reload(self) -> None:
+        try:
+            # Remembered even on failure so a broken file is reported once
+            self._mtime = os.stat(self.path).st_mtime_ns
+            with open(self.path, encoding="utf-8") as f:
+                rules = CompiledRules(json.load(f))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Analysis rules load error ({self.path}): {e}")
+            return
+        self.rules = rules
+        self.reloads += 1
+
+    def evaluate(self, text: str) -> Dict[str, Any]:
+        self._check_for_changes()
+        if self.rules is None:
+            raise RuntimeError(f"No analysis rules loaded from {self.path}")
+        return self.rules.evaluate(text)
+
+    def _check_for_changes(self) -> None:
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return
+        if mtime != self._mtime:
+            self.reload()
+
+# Create a singleton instance
+rule_engine = RuleEngine(settings.ANALYSIS_RULES_PATH, settings.ANALYSIS_RULES_RELOAD_INTERVAL)
@@ -0,0 +1,218 @@
+import asyncio
+import math
+import re
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import event, func, literal, literal_column, null, select, tuple_, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.database import DIALECT_NAME, AsyncSessionLocal, Idea, Comment, Prompt
+
+SEARCH_TYPES = ("idea", "comment", "prompt")
+
+# Characters of the main text returned with each hit
+SNIPPET_LENGTH = 200
+
+# Relative weight of title-like fields over body fields ('A' vs 'B' in Postgres)
+TITLE_WEIGHT = 1.0
+BODY_WEIGHT = 0.4
+
+_TOKEN = re.compile(r"[^\W_]+")
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercased word tokens, matching Postgres' 'simple' configuration"""
+    return _TOKEN.findall(text.casefold()) if text else []
+
+def _snippet(text: Optional[str]) -> str:
+    return (text or "")[:SNIPPET_LENGTH]
+
+class InvertedIndex:
+    """In-memory inverted index with prefix matching and tf-idf ranking
+
+    Terms are kept sorted so every query token is expanded to the indexed
+    terms it prefixes with a binary search. A document matches when every
+    query token matches one of its terms, like `a:* & b:*` in Postgres.
+    """
+
+    def __init__(self):
+        self.documents: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._postings: Dict[str, Dict[Tuple[str, str], float]] = {}
+        self._terms: List[str] = []
+
+    def add(self, key: Tuple[str, str], fields: Sequence[Tuple[Optional[str], float]], document: Dict[str, Any]) -> None:
+        self.documents[key] = document
+        for text, weight in fields:
+            for term in tokenize(text):
+                postings = self._postings.setdefault(term, {})
+                postings[key] = postings.get(key, 0.0) + weight
+
+    def finish(self) -> None:
+        self._terms = sorted(self._postings)
+
+    def search(self, tokens: Sequence[str]) -> Dict[Tuple[str, str], float]:
+        scores: Optional[Dict[Tuple[str, str], float]] = None
+        total = len(self.documents)
+        for token in tokens:
+            matches: Dict[Tuple[str, str], float] = {}
+            position = bisect_left(self._terms, token)
+            while position < len(self._terms) and self._terms[position].startswith(token):
+                postings = self._postings[self._terms[position]]
+                idf = math.log(1 + total / len(postings))
+                for key, weight in postings.items():
+                    matches[key] = matches.get(key, 0.0) + weight * idf
+                position += 1
+            if scores is None:
+                scores = matches
+            else:
+                scores = {key: score + matches[key] for key, score in scores.items() if key in matches}
+            if not scores:
+                return {}
+        return scores or {}
+
+class FallbackSearch:
+    """Search for databases without tsvector support (SQLite test setups)
+
+    The index is built from the database on first use and rebuilt lazily
+    after any committed write to ideas, comments or prompts.
+    """
+
+    def __init__(self):
+        self.index: Optional[InvertedIndex] = None
+        self.rebuilds = 0
+        self._lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        self.index = None
+
+    async def get_index(self) -> InvertedIndex:
+        async with self._lock:
+            if self.index is None:
+                self.index = await self._build()
+                self.rebuilds += 1
+            return self.index
+
+    async def _build(self) -> InvertedIndex:
+        index = InvertedIndex()
+        async with AsyncSessionLocal() as db:
+            ideas = await db.execute(select(
+                Idea.id, Idea.title, Idea.description, Idea.user_session, Idea.created_at
+            ))
+            for id, title, description, user_session, created_at in ideas:
+                index.add(("idea", id), [(title, TITLE_WEIGHT), (description, BODY_WEIGHT)], {
+                    "type": "idea", "id": id, "idea_id": None, "title": title,
+                    "snippet": _snippet(description), "user_session": user_session, "created_at": created_at
+                })
+
+            comments = await db.execute(select(
+                Comment.id, Comment.idea_id, Comment.content, Comment.user_session, Comment.created_at
+            ))
+            for id, idea_id, content, user_session, created_at in comments:
+                index.add(("comment", id), [(content, TITLE_WEIGHT)], {
+                    "type": "comment", "id": id, "idea_id": idea_id, "title": None,
+                    "snippet": _snippet(content), "user_session": user_session, "created_at": created_at
+                })
+
+            prompts = await db.execute(select(
+                Prompt.id, Prompt.project_idea, Prompt.final_prompt, Prompt.user_session, Prompt.created_at
+            ))
+            for id, project_idea, final_prompt, user_session, created_at in prompts:
+                index.add(("prompt", id), [(project_idea, TITLE_WEIGHT), (final_prompt, BODY_WEIGHT)], {
+                    "type": "prompt", "id": id, "idea_id": None, "title": _snippet(project_idea),
+                    "snippet": _snippet(final_prompt), "user_session": user_session, "created_at": created_at
+                })
+        index.finish()
+        return index
+
+fallback_search = FallbackSearch()
+
+# Mark sessions that wrote anything so their commit invalidates the fallback index
+_WROTE = "search_index_dirty"
+
+def _mark_bulk_write(state) -> None:
+    if not state.is_select:
+        state.session.info[_WROTE] = True
+
+def _mark_flush(session, flush_context) -> None:
+    session.info[_WROTE] = True
+
+def _invalidate_on_commit(session) -> None:
+    if session.info.pop(_WROTE, False):
+        fallback_search.invalidate()
+
+if DIALECT_NAME != "postgresql":
+    event.listen(Session, "do_orm_execute", _mark_bulk_write)
+    event.listen(Session, "after_flush", _mark_flush)
+    event.listen(Session, "after_commit", _invalidate_on_commit)
+
+def _ranked_hits(rows: Sequence[Dict[str, Any]], after: Optional[Tuple[float, str]], limit: int) -> List[Dict[str, Any]]:
+    rows = sorted(rows, key=lambda row: (row["rank"], row["id"]), reverse=True)
+    if after is not None:
+        rows = [row for row in rows if (row["rank"], row["id"]) < after]
+    return rows[:limit + 1]
+
+async def _search_fallback(
+    tokens: List[str], session: Optional[str], types: Sequence[str], after: Optional[Tuple[float, str]], limit: int
+) -> List[Dict[str, Any]]:
+    index = await fallback_search.get_index()
+    hits = []
+    for key, score in index.search(tokens).items():
+        document = index.documents[key]
+        if document["type"] not in types or (session and document["user_session"] != session):
+            continue
+        hit = {field: value for field, value in document.items() if field != "user_session"}
+        hit["rank"] = score
+        hits.append(hit)
+    return _ranked_hits(hits, after, limit)
+
+async def _search_postgres(
+    db: AsyncSession, tokens: List[str], session: Optional[str], types: Sequence[str],
+    after: Optional[Tuple[float, str]], limit: int
+) -> List[Dict[str, Any]]:
+    # Every token is a prefix match and all of them must match
+    query = func.to_tsquery("simple", " & ".join(f"{token}:*" for token in tokens))
+
+    def branch(kind: str, model: Any, idea_id: Any, title: Any, body: Any):
+        vector = literal_column(f"{model.__tablename__}.search_vector")
+        statement = select(
+            literal(kind).label("type"),
+            model.id.label("id"),
+            idea_id.label("idea_id"),
+            title.label("title"),
+            func.substr(body, 1, SNIPPET_LENGTH).label("snippet"),
+            func.ts_rank(vector, query).label("rank"),
+            model.created_at.label("created_at")
+        ).where(vector.op("@@")(query))
+        if session:
+            statement = statement.where(model.user_session == session)
+        return statement
+
+    branches = {
+        "idea": lambda: branch("idea", Idea, null(), Idea.title, Idea.description),
+        "comment": lambda: branch("comment", Comment, Comment.idea_id, null(), Comment.content),
+        "prompt": lambda: branch(
+            "prompt", Prompt, null(), func.substr(Prompt.project_idea, 1, SNIPPET_LENGTH), Prompt.final_prompt
+        ),
+    }
+    hits = union_all(*(branches[kind]() for kind in types)).subquery()
+    statement = select(hits)
+    if after is not None:
+        statement = statement.where(tuple_(hits.c.rank, hits.c.id) < tuple_(*after))
+    statement = statement.order_by(hits.c.rank.desc(), hits.c.id.desc()).limit(limit + 1)
+    return [dict(row) for row in (await db.execute(statement)).mappings()]
+
+async def search(
+    db: AsyncSession, text: str, session: Optional[str], types: Sequence[str],
+    after: Optional[Tuple[float, str]], limit: int
+) -> List[Dict[str, Any]]:
+    """Ranked hits for `text`, best first, fetching one row beyond `limit`
+
+    Each hit has type, id, idea_id (comments), title, snippet, rank and
+    created_at. Postgres answers from the GIN-indexed tsvector columns;
+    other databases use the in-process inverted index.
+    """
+    tokens = tokenize(text)
+    if not tokens or not types:
+        return []
+    if DIALECT_NAME == "postgresql":
+        return await _search_postgres(db, tokens, session, types, after, limit)
+    return await _search_fallback(tokens, session, types, after, limit)
@@ -0,0 +1,290 @@
+import asyncio
+import re
+import zlib
+from typing import Any, Dict, List, Optional, Set, Tuple
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import load_only
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, Prompt
+from app.services.analysis_cache import normalize_idea
+
+# Stored prompts keep only the tool name; these fill in the rest on reuse
+AI_TOOLS = {
+    "v0.dev": ("Optimized for React/Next.js UI components", ["UI Components", "React Applications"], "Specific component requests"),
+    "Cursor.ai": ("Optimized for full-stack applications", ["Full-stack Apps", "File Structure"], "Detailed file structure"),
+    "GPT Engineer": ("Optimized for building complete applications from scratch", ["New Applications"], "High-level descriptions"),
+    "Claude Dev": ("Optimized for complex logic and architecture", ["Complex Logic", "Architecture Design"], "Step-by-step analysis"),
+}
+
+# "to-do" and "e-commerce" are one word; "drag-and-drop" is three
+_SHORT_JOINED = re.compile(r"\b(?:\w{1,2}[-']\w+|\w+[-']\w{1,2})\b")
+_WORD = re.compile(r"[^\W_]+")
+# Words that say nothing about what is being built
+_FILLER = frozenset(
+    "a an the and or of in on to for with without by from as into that which who where my our your "
+    "use using based built build building create make simple basic app apps application applications "
+    "platform website site tool service system project support supports feature features".split()
+)
+_SUFFIXES = ("ing", "ers", "er", "es", "s", "ed")
+
+# Technologies recognized in ideas even before an indexed analysis names them
+COMMON_STACK_TERMS = (
+    "React", "React Native", "Vue", "Angular", "Svelte", "Next.js", "Nuxt", "Flutter", "Swift", "Kotlin",
+    "Electron", "Node.js", "Express", "Django", "Flask", "FastAPI", "Rails", "Laravel", "Spring",
+    "Rust", "PHP", "Java", "Python", "TypeScript", "GraphQL", "PostgreSQL", "MySQL", "MongoDB",
+    "Redis", "SQLite", "Firebase", "Supabase", "DynamoDB", "Elasticsearch", "Kafka", "Stripe", "PayPal",
+    "WordPress", "Shopify", "Unity", "TensorFlow", "PyTorch", "AWS", "Azure", "GCP", "Vercel", "Heroku",
+)
+
+def _stem(word: str) -> str:
+    """Fold common suffixes: tracker/tracking, blog/blogging, finance/finances"""
+    for suffix in _SUFFIXES:
+        if len(word) - len(suffix) >= 3 and word.endswith(suffix):
+            word = word[:-len(suffix)]
+            if len(word) > 3 and word[-1] == word[-2] and word[-1] not in "aeiouls":
+                word = word[:-1]
+            break
+    return word[:-1] if len(word) > 4 and word.endswith("e") else word
+
+def _words(text: str) -> List[str]:
+    joined = _SHORT_JOINED.sub(lambda match: re.sub("[-']", "", match.group(0)), normalize_idea(text))
+    return [word for word in _WORD.findall(joined) if word not in _FILLER]
+
+def idea_terms(text: str) -> List[str]:
+    """The stemmed content words of an idea"""
+    return [_stem(word) for word in _words(text)]
+
+class HashedNgramEmbedder:
+    """Offline text embedder using signed feature hashing
+
+    Features are stemmed content words plus, at `ngram_weight`, character
+    n-grams of each word, so paraphrases sharing vocabulary or word stems
+    land close together while ideas sharing only long words do not. Any
+    object with `dim` and `embed(text) -> unit vector` can replace it.
+    """
+
+    def __init__(self, dim: int = 1024, ngram: int = 3, ngram_weight: float = 0.3):
+        self.dim = dim
+        self.ngram = ngram
+        self.ngram_weight = ngram_weight
+
+    def features(self, text: str) -> List[Tuple[str, float]]:
+        words = _words(text)
+        features = [(f"w:{_stem(word)}", 1.0) for word in words]
+        for word in words:
+            padded = f"#{word}#"
+            grams = [padded[i:i + self.ngram] for i in range(max(1, len(padded) - self.ngram + 1))]
+            # Long words don't outweigh short ones through their n-gram count
+            weight = self.ngram_weight / len(grams) ** 0.5
+            features.extend((gram, weight) for gram in grams)
+        return features
+
+    def embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature, weight in self.features(text):
+            hashed = zlib.crc32(feature.encode("utf-8"))
+            vector[hashed % self.dim] += weight if hashed & 0x80000000 else -weight
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+class VectorIndex:
+    """Fixed-capacity cosine-similarity index over unit vectors
+
+    Queries are a single matrix-vector product over every stored vector.
+    With `planes` set, vectors are also bucketed by random-hyperplane LSH
+    signatures and only the query's bucket and its one-bit neighbours are
+    scored. Once full, the oldest entries are overwritten.
+    """
+
+    def __init__(self, dim: int, capacity: int, planes: int = 0, seed: int = 0):
+        planes = min(planes, 62)  # signatures are packed into an int64
+        self.dim = dim
+        self.capacity = capacity
+        self._vectors = np.zeros((min(capacity, 1024), dim), dtype=np.float32)
+        self._payloads: List[Any] = []
+        self._next = 0
+        self._planes = np.random.default_rng(seed).standard_normal((planes, dim)).astype(np.float32) if planes else None
+        self._bit_values = 1 << np.arange(planes, dtype=np.int64)
+        self._buckets: Dict[int, Set[int]] = {}
+        self._slot_buckets: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._payloads)
+
+    def add(self, vector: np.ndarray, payload: Any) -> None:
+        if len(self._payloads) < self.capacity:
+            slot = len(self._payloads)
+            if slot == len(self._vectors):
+                grown = np.zeros((min(self.capacity, slot * 2), self.dim), dtype=np.float32)
+                grown[:slot] = self._vectors
+                self._vectors = grown
+            self._payloads.append(payload)
+            self._slot_buckets.append(-1)
+        else:
+            slot = self._next
+            self._next = (self._next + 1) % self.capacity
+            self._payloads[slot] = payload
+            self._buckets.get(self._slot_buckets[slot], set()).discard(slot)
+
+        self._vectors[slot] = vector
+        if self._planes is not None:
+            bucket = self._signature(vector)
+            self._buckets.setdefault(bucket, set()).add(slot)
+            self._slot_buckets[slot] = bucket
+
+    def query(self, vector: np.ndarray, k: int = 1) -> List[Tuple[float, Any]]:
+        """Up to `k` (similarity, payload) pairs, most similar first"""
+        if not self._payloads:
+            return []
+        if self._planes is None:
+            candidates = None
+            scores = self._vectors[:len(self._payloads)] @ vector
+        else:
+            candidates = np.fromiter(self._candidates(self._signature(vector)), dtype=np.int64)
+            if not len(candidates):
+                return []
+            scores = self._vectors[candidates] @ vector
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        slots = top if candidates is None else candidates[top]
+        return [(float(scores[i]), self._payloads[slot]) for i, slot in zip(top, slots)]
+
+    def _signature(self, vector: np.ndarray) -> int:
+        return int(self._bit_values[self._planes @ vector > 0].sum())
+
+    def _candidates(self, bucket: int) -> Set[int]:
+        candidates = set(self._buckets.get(bucket, ()))
+        for bit in range(len(self._planes)):
+            candidates.update(self._buckets.get(bucket ^ (1 << bit), ()))
+        return candidates
+
+def _analysis_from_prompt(prompt: Prompt) -> Dict[str, Any]:
+    """Rebuild the analysis fields a saved prompt was created from"""
+    description, best_for, prompt_style = AI_TOOLS.get(prompt.recommended_tool, ("", [], ""))
+    detected_stack = dict(prompt.detected_stack)
+    detected_stack.setdefault("deployment", prompt.infra_tools.get("hosting", []))
+    return {
+        "detectedStack": detected_stack,
+        "recommendedTool": {
+            "name": prompt.recommended_tool,
+            "description": description,
+            "bestFor": best_for,
+            "promptStyle": prompt_style
+        },
+        "devStructure": prompt.dev_structure,
+        "infraTools": prompt.infra_tools
+    }
+
+class SimilarityIndex:
+    """Prior analyses indexed by the embedding of their project idea
+
+    Seeded at startup from the most recent saved prompts and extended with
+    every new analysis and prompt, so a paraphrased idea can reuse an
+    earlier answer instead of calling the model again. A match is only reused when
+    both ideas name the same technologies: the stack terms are the common
+    ones plus every term in an indexed analysis's detected stack, so
+    "todo app with react" never reuses the answer for "todo app with vue".
+    """
+
+    def __init__(self, embedder: Optional[Any] = None):
+        self.enabled = settings.SIMILARITY_ENABLED
+        self.threshold = settings.SIMILARITY_THRESHOLD
+        self.embedder = embedder or HashedNgramEmbedder(dim=settings.SIMILARITY_DIM)
+        self.index = VectorIndex(
+            self.embedder.dim,
+            settings.SIMILARITY_MAX_ENTRIES,
+            planes=settings.SIMILARITY_ANN_PLANES if settings.SIMILARITY_ANN else 0
+        )
+        self.stack_terms: Set[str] = {term for name in COMMON_STACK_TERMS for term in idea_terms(name)}
+        self.loaded = False
+        self.hits = 0
+        self.misses = 0
+        self._lock = asyncio.Lock()
+
+    def add(self, project_idea: str, analysis: Dict[str, Any], language: Optional[str] = None) -> None:
+        if not self.enabled:
+            return
+        for names in (analysis.get("detectedStack") or {}).values():
+            for name in names:
+                self.stack_terms.update(idea_terms(name))
+        self.index.add(self.embedder.embed(project_idea), {
+            "idea": normalize_idea(project_idea),
+            "terms": frozenset(idea_terms(project_idea)),
+            "language": language,
+            "analysis": analysis
+        })
+
+    def add_prompt(self, prompt: Prompt) -> None:
+        # Prompts saved before the index loads are picked up by the load itself
+        if self.loaded:
+            self.add(prompt.project_idea, _analysis_from_prompt(prompt))
+
+    async def find(self, project_idea: str, language: str = "en") -> Optional[Tuple[float, Dict[str, Any]]]:
+        """The most similar prior analysis at or above the threshold
+
+        Exact repeats are left to the analysis cache, which holds the
+        model's full answer for that exact idea: if the idea itself is
+        among the matches, nothing is reused.
+        """
+        if not self.enabled:
+            return None
+        await self.load()
+
+        idea = normalize_idea(project_idea)
+        matches = [
+            (score, entry) for score, entry in self.index.query(self.embedder.embed(project_idea), k=5)
+            if score >= self.threshold and entry["language"] in (None, language)
+        ]
+        if all(entry["idea"] != idea for _, entry in matches):
+            stack = self.stack_terms.intersection(idea_terms(project_idea))
+            for score, entry in matches:
+                if entry["terms"] & self.stack_terms == stack:
+                    self.hits += 1
+                    return score, entry["analysis"]
+        self.misses += 1
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "entries": len(self.index),
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+    async def load(self) -> None:
+        """Seed the index from saved prompts, once
+
+        Run by the startup warm-up; `find` falls back to it if that failed.
+        """
+        if not self.enabled or self.loaded:
+            return
+        async with self._lock:
+            if self.loaded:
+                return
+            try:
+                async with AsyncSessionLocal() as db:
+                    prompts = (await db.scalars(
+                        select(Prompt)
+                        # Skip the generated prompt texts, by far the largest columns
+                        .options(load_only(
+                            Prompt.project_idea, Prompt.detected_stack, Prompt.recommended_tool,
+                            Prompt.dev_structure, Prompt.infra_tools
+                        ))
+                        .order_by(Prompt.created_at.desc())
+                        .limit(settings.SIMILARITY_MAX_ENTRIES)
+                    )).all()
+            except Exception as e:
+                # Serve without reuse and try again on the next request
+                print(f"Similarity index load error: {e}")
+                return
+            for prompt in reversed(prompts):
+                self.add(prompt.project_idea, _analysis_from_prompt(prompt))
+            self.loaded = True
+
+# Create a singleton instance
+similarity_index = SimilarityIndex()
@@ -0,0 +1,286 @@
+import asyncio
+import heapq
+import json
+import math
+import multiprocessing
+import os
+import re
+import string
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import cached_property
+from operator import itemgetter, mul
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from app.core.config import settings
+
+# Keywords returned by keyword extraction
+TOP_KEYWORDS = 5
+# Distinct words whose syllable counts are kept between texts
+SYLLABLE_CACHE_SIZE = 200_000
+
+# Stripped from both ends of whitespace-separated tokens to get the word
+_PUNCTUATION = string.punctuation + "\u2018\u201c\u201d\u00ab\u00bb\u2013\u2014\u2026"
+# Closing marks that may follow a sentence-ending '.', '!' or '?'
+_CLOSERS = "\"')]}\u201d\u00bb"
+_SENTENCE_ENDS = (".", "!", "?", "\u2026")
+_LAST_CHARS = frozenset(_CLOSERS).union(*_SENTENCE_ENDS)
+
+# A negator and the token it applies to; word boundaries are checked by hand
+# because a leading \b would disable the regex engine's literal prefix scan
+_NEGATION = re.compile(r"(?:not|no|never|nor|cannot|without|n't)\s+(\S+)")
+# Negated sentiment words flip polarity at reduced strength ("not good")
+NEGATION_WEIGHT = 0.5
+# Normalizes summed valence into (-1, 1), as in VADER
+SENTIMENT_ALPHA = 15
+SENTIMENT_NEUTRAL_BAND = 0.05
+
+_VOWEL_MARKS = bytes(
+    ord("a") if chr(byte) in "aeiouy" else byte if chr(byte) == "\n" else ord("b") for byte in range(256)
+)
+# A final "e", "ed" or "es" is usually silent ("make", "jumped", "makes") but
+# not in these endings ("table", "wanted", "boxes")
+_SILENT_E_ENDINGS = ("e", "ed", "es")
+_SOUNDED_E_ENDINGS = ("le", "ee", "ye", "ted", "ded", "ses", "zes", "xes", "ches", "shes", "ces", "ges")
+
+def _load_lexicon(path: str) -> Dict[str, Tuple[int, Optional[str]]]:
+    """word -> (valence, emotion) from the sentiment lexicon file"""
+    with open(path, encoding="utf-8") as f:
+        table = json.load(f)
+    lexicon = {word: (valence, None) for word, valence in table["words"].items()}
+    for emotion, words in table["emotions"].items():
+        lexicon.update((word, (valence, emotion)) for word, valence in words.items())
+    return lexicon
+
+LEXICON = _load_lexicon(settings.SENTIMENT_LEXICON_PATH)
+EMOTIONS = sorted({emotion for _, emotion in LEXICON.values() if emotion})
+
+class TextScan:
+    """Counts gathered from one pass over a text
+
+    The lowercased text is split on whitespace once and the tokens counted in
+    C; punctuation is then stripped per distinct token rather than per
+    occurrence, which is what keeps megabyte inputs fast. Sentence ends are
+    read off the same tokens. Words following a negator are only looked for
+    when sentiment asks for them.
+    """
+
+    def __init__(self, text: str):
+        self._lowered = text.lower().replace("\u2019", "'")
+        self.characters = len(text)
+        self.paragraphs = text.count("\n\n") + 1
+
+        words: Dict[str, int] = {}
+        sentences = 0
+        for token, count in Counter(self._lowered.split()).items():
+            if token[-1] in _LAST_CHARS and token.rstrip(_CLOSERS).endswith(_SENTENCE_ENDS):
+                sentences += count
+            word = token.strip(_PUNCTUATION)
+            if word:
+                words[word] = words.get(word, 0) + count
+        self.words = words
+        self.word_count = sum(words.values())
+
+        # Text after the last sentence end is a sentence too
+        last = self._lowered.rsplit(None, 1)[-1:]
+        if self.word_count and not last[0].rstrip(_CLOSERS).endswith(_SENTENCE_ENDS):
+            sentences += 1
+        self.sentences = sentences
+
+    @cached_property
+    def negated(self) -> Dict[str, int]:
+        """How often each word directly follows a negator"""
+        lowered = self._lowered
+        negated: Dict[str, int] = {}
+        for match in _NEGATION.finditer(lowered):
+            start = match.start()
+            if start and lowered[start - 1].isalnum() and not match.group(0).startswith("n't"):
+                continue
+            word = match.group(1).strip(_PUNCTUATION)
+            negated[word] = negated.get(word, 0) + 1
+        return negated
+
+def count_syllables(words: List[str]) -> List[int]:
+    """Estimated syllables in each lowercase English word
+
+    Counts vowel groups, less a silent final 'e'; every word has at least
+    one syllable. All words are marked in a few bytes operations, vowels as
+    'a' and anything else as 'b', so a vowel group is each "ba".
+    """
+    marked = ("\n" + "\n".join(words)).encode("ascii", "replace").translate(_VOWEL_MARKS)
+    counts = []
+    for word, marks in zip(words, marked.replace(b"\n", b"\nb").split(b"\n")[1:]):
+        syllables = marks.count(b"ba")
+        if syllables > 1 and word.endswith(_SILENT_E_ENDINGS) and not word.endswith(_SOUNDED_E_ENDINGS):
+            syllables -= 1
+        counts.append(syllables or 1)
+    return counts
+
+_syllable_cache: Dict[str, int] = {}
+
+def cached_syllables(words: List[str]) -> List[int]:
+    """`count_syllables`, remembering each distinct word across texts"""
+    cache = _syllable_cache
+    counts = list(map(cache.get, words))
+    if None in counts:
+        missing = [word for word, count in zip(words, counts) if count is None]
+        counted = count_syllables(missing)
+        if len(cache) + len(missing) > SYLLABLE_CACHE_SIZE:
+            cache.clear()
+        cache.update(zip(missing, counted))
+        fresh = iter(counted)
+        counts = [next(fresh) if count is None else count for count in counts]
+    return counts
+
+def _ordinal(n: int) -> str:
+    suffix = "th" if 10 <= n % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
+    return f"{n}{suffix}"
+
+def grade_level(grade: float) -> str:
+    """Reading level label for a Flesch-Kincaid grade"""
+    if grade < 1:
+        return "Kindergarten"
+    if grade < 12:
+        return f"{_ordinal(int(grade))}-{_ordinal(int(grade) + 1)} grade"
+    if grade < 13:
+        return "12th grade"
+    return "College" if grade < 16 else "College graduate"
+
+def sentiment(scan: TextScan) -> Dict[str, Any]:
+    """Lexicon-based sentiment with negation handling"""
+    total = 0.0
+    positive = negative = 0
+    emotions = dict.fromkeys(EMOTIONS, 0.0)
+    for word in scan.words.keys() & LEXICON.keys():
+        valence, emotion = LEXICON[word]
+        count = scan.words[word]
+        negated = min(scan.negated.get(word, 0), count)
+        plain = count - negated
+        total += valence * plain - valence * NEGATION_WEIGHT * negated
+        if valence > 0:
+            positive += plain
+            negative += negated
+        else:
+            negative += plain
+            positive += negated
+        if emotion:
+            emotions[emotion] += abs(valence) * plain
+
+    score = total / math.sqrt(total * total + SENTIMENT_ALPHA)
+    if score >= SENTIMENT_NEUTRAL_BAND:
+        label = "positive"
+    elif score <= -SENTIMENT_NEUTRAL_BAND:
+        label = "negative"
+    else:
+        label = "neutral"
+    emotion_total = sum(emotions.values())
+    return {
+        "sentiment": label,
+        "score": round(score, 4),
+        "emotions": {
+            emotion: round(weight / emotion_total, 4) if emotion_total else 0.0
+            for emotion, weight in emotions.items()
+        },
+        "positive_words": positive,
+        "negative_words": negative
+    }
+
+def readability(scan: TextScan) -> Dict[str, Any]:
+    """Flesch reading ease and Flesch-Kincaid grade"""
+    words = scan.word_count
+    sentences = max(scan.sentences, 1)
+    syllables = sum(map(mul, scan.words.values(), cached_syllables(list(scan.words))))
+    words_per_sentence = words / sentences
+    syllables_per_word = syllables / words if words else 0.0
+    grade = 0.39 * words_per_sentence + 11.8 * syllables_per_word - 15.59 if words else 0.0
+    return {
+        "readability_score": round(grade, 2),
+        "grade_level": grade_level(grade),
+        "flesch_reading_ease": round(206.835 - 1.015 * words_per_sentence - 84.6 * syllables_per_word, 2) if words else 0.0,
+        "sentence_count": scan.sentences,
+        "word_count": words,
+        "syllable_count": syllables,
+        "avg_words_per_sentence": round(words_per_sentence, 2),
+        "avg_syllables_per_word": round(syllables_per_word, 2)
+    }
+
+def keywords(scan: TextScan) -> Dict[str, Any]:
+    return {
+        # nlargest is stable, so ties keep first-occurrence order
+        "keywords": heapq.nlargest(TOP_KEYWORDS, scan.words.items(), key=itemgetter(1)),
+        "total_words": scan.word_count,
+        "unique_words": len(scan.words)
+    }
+
+def general(scan: TextScan) -> Dict[str, Any]:
+    return {
+        "character_count": scan.characters,
+        "word_count": scan.word_count,
+        "sentence_count": scan.sentences,
+        "paragraph_count": scan.paragraphs,
+        "language": "detected_language"
+    }
+
+ANALYZERS: Dict[str, Callable[[TextScan], Dict[str, Any]]] = {
+    "general": general,
+    "sentiment": sentiment,
+    "keywords": keywords,
+    "readability": readability
+}
+
+def analyze(text: str, analysis_type: str = "general") -> Dict[str, Any]:
+    """Results for one text; unknown types get the general statistics"""
+    return ANALYZERS.get(analysis_type, general)(TextScan(text))
+
+def analyze_many(texts: List[str], analysis_type: str = "general") -> List[Dict[str, Any]]:
+    """`analyze` over a list of texts; the unit of work sent to pool workers"""
+    return [analyze(text, analysis_type) for text in texts]
+
+class TextAnalyzer:
+    """Runs batch text analysis inline or across a process pool
+
+    Batches under `pool_min_chars` characters are analyzed on the event loop,
+    where pickling them to another process would cost more than the work.
+    Larger batches are split into one chunk per worker so the CPU-bound
+    counting runs in parallel without blocking other requests.
+    """
+
+    def __init__(self, workers: int = 0, pool_min_chars: int = 1_000_000):
+        self.workers = workers or os.cpu_count() or 1
+        self.pool_min_chars = pool_min_chars
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    async def analyze_batch(self, texts: List[str], analysis_type: str = "general") -> List[Dict[str, Any]]:
+        if self.workers < 2 or sum(map(len, texts)) < self.pool_min_chars:
+            return analyze_many(texts, analysis_type)
+
+        loop = asyncio.get_running_loop()
+        size = -(-len(texts) // self.workers)
+        chunks = [texts[i:i + size] for i in range(0, len(texts), size)]
+        try:
+            pool = self._get_pool()
+            results = await asyncio.gather(*(
+                loop.run_in_executor(pool, analyze_many, chunk, analysis_type) for chunk in chunks
+            ))
+        except BrokenProcessPool as e:
+            # A worker died (e.g. OOM killed); start a fresh pool next time
+            print(f"Text analysis pool error: {e}")
+            self.shutdown()
+            return analyze_many(texts, analysis_type)
+        return [result for chunk in results for result in chunk]
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Spawned rather than forked: the server process has running threads
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+# Create a singleton instance
+text_analyzer = TextAnalyzer(settings.TEXT_ANALYSIS_WORKERS, settings.TEXT_ANALYSIS_POOL_MIN_CHARS)
@@ -0,0 +1,150 @@
+"""Offline stand-in for the OpenAI chat completions API
+
+Answers `POST /v1/chat/completions` (plain and streamed) and
+`GET /v1/models/{model}` with a fixed project analysis after a configurable
+delay, failing a configurable share of calls with 500s or 429s. Point the
+app at it with OPENAI_BASE_URL=http://127.0.0.1:<port>/v1.
+
+Run from backend/: python -m benchmarks.fake_openai [--port 8100] [--latency 0.5]
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+ANALYSIS = {
+    "detectedStack": {
+        "frontend": ["React", "TypeScript"],
+        "backend": ["FastAPI", "Python"],
+        "database": ["PostgreSQL"],
+        "deployment": ["Docker"],
+        "additional": ["Redis"]
+    },
+    "recommendedTool": {
+        "name": "Cursor.ai",
+        "description": "Optimal for full-stack application development",
+        "bestFor": ["Full-stack Apps"],
+        "promptStyle": "Detailed file structure and implementation"
+    },
+    "devStructure": {
+        "type": "monorepo",
+        "name": "Monorepo Structure",
+        "description": "Single repository for every package",
+        "pros": ["Unified tooling"],
+        "cons": ["Build complexity"],
+        "bestFor": ["Shared components"]
+    },
+    "infraTools": {
+        "containerization": ["Docker"],
+        "orchestration": ["Docker Compose"],
+        "cicd": ["GitHub Actions"],
+        "monitoring": ["Prometheus"],
+        "hosting": ["Render"]
+    },
+    "generatedPrompt": "Build the application described above.",
+    "reasoning": "Canned answer from the benchmark stand-in."
+}
+
+class FakeConfig:
+    latency = 0.5  # seconds before the answer (the first chunk, when streaming)
+    jitter = 0.2  # latency varies uniformly by this fraction either way
+    error_rate = 0.0  # share of calls answered with a 500
+    rate_limit_rate = 0.0  # share of calls answered with a 429
+    chunks = 20  # streamed answers are split into this many chunks
+    chunk_delay = 0.02  # seconds between streamed chunks
+
+config = FakeConfig()
+app = FastAPI(title="Fake OpenAI")
+
+def _delay() -> float:
+    return max(0.0, config.latency * random.uniform(1 - config.jitter, 1 + config.jitter))
+
+def _failure() -> Optional[JSONResponse]:
+    roll = random.random()
+    if roll < config.rate_limit_rate:
+        return JSONResponse(
+            {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+            status_code=429,
+            headers={"retry-after": "1"}
+        )
+    if roll < config.rate_limit_rate + config.error_rate:
+        return JSONResponse({"error": {"message": "Injected failure", "type": "server_error"}}, status_code=500)
+    return None
+
+def _usage(body: Dict[str, Any], content: str) -> Dict[str, int]:
+    prompt_tokens = sum(len(message.get("content") or "") for message in body.get("messages", [])) // 4
+    completion_tokens = len(content) // 4
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens
+    }
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    await asyncio.sleep(_delay())
+    failure = _failure()
+    if failure is not None:
+        return failure
+
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    created = int(time.time())
+    model = body.get("model", "gpt-4")
+    content = json.dumps(ANALYSIS)
+
+    if not body.get("stream"):
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": _usage(body, content)
+        }
+
+    async def chunks():
+        size = -(-len(content) // max(config.chunks, 1))
+        for start in range(0, len(content), size):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": content[start:start + size]}, "finish_reason": None}]
+            }
+            yield f"data: {json.dumps(chunk)}\n\n"
+            await asyncio.sleep(config.chunk_delay)
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(chunks(), media_type="text/event-stream")
+
+@app.get("/v1/models/{model}")
+async def retrieve_model(model: str):
+    return {"id": model, "object": "model", "created": 0, "owned_by": "benchmark"}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", type=float, default=config.latency)
+    parser.add_argument("--jitter", type=float, default=config.jitter)
+    parser.add_argument("--error-rate", type=float, default=config.error_rate)
+    parser.add_argument("--rate-limit-rate", type=float, default=config.rate_limit_rate)
+    parser.add_argument("--chunks", type=int, default=config.chunks)
+    parser.add_argument("--chunk-delay", type=float, default=config.chunk_delay)
+    args = parser.parse_args()
+
+    for name in ("latency", "jitter", "error_rate", "rate_limit_rate", "chunks", "chunk_delay"):
+        setattr(config, name, getattr(args, name))
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
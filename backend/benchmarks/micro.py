@@ -0,0 +1,120 @@
+"""Per-call cost of the CPU-bound pieces behind project analysis
+
+Times the rule-based offline analysis, prompt generation from edited data,
+and encoding a project analysis response the way FastAPI does for a
+response model, with `model_dump_json`, and with `json_response`. Text
+analysis is timed on a 1 MB input of mostly distinct words, the worst case
+for the per-word work; `readability_1mb_cold` starts each call with an empty
+syllable cache.
+
+Run from backend/: python -m benchmarks.micro [--output micro-results.json]
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import string
+import time
+from typing import Any, Callable, Dict, List
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from fastapi.encoders import jsonable_encoder
+from app.api.v1.endpoints.analyze import (
+    ProjectAnalyzeResponse, _generate_prompt_from_custom_data, _get_mock_analysis
+)
+from app.core.responses import json_response
+from app.services import text_analysis
+
+IDEAS = [
+    "A React Native app for tracking gym workouts with a FastAPI backend",
+    "Realtime chat platform with websockets, Redis pub/sub and Kubernetes",
+    "Machine learning dashboard to monitor model drift using PyTorch",
+    "E-commerce storefront on Next.js with Stripe payments and PostgreSQL",
+    "Simple blog",
+]
+
+def large_text(size: int = 1_000_000, vocabulary: int = 120_000, seed: int = 0) -> str:
+    """Random words with some sentence and clause ends, about `size` characters"""
+    rng = random.Random(seed)
+    words = [
+        "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 11)))
+        for _ in range(vocabulary)
+    ]
+    tokens = []
+    length = 0
+    while length < size:
+        token = rng.choice(words) + rng.choices(("", ".", ","), (88, 7, 5))[0]
+        tokens.append(token)
+        length += len(token) + 1
+    return " ".join(tokens)[:size]
+
+def measure(fn: Callable[[], Any], target: float = 0.2, repeat: int = 5) -> Dict[str, float]:
+    """Best and median microseconds per call over `repeat` timed batches"""
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        if time.perf_counter() - started >= target / 10 or loops >= 1_000_000:
+            break
+        loops *= 10
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        timings.append((time.perf_counter() - started) / loops * 1e6)
+    timings.sort()
+    return {"loops": loops, "best_us": round(timings[0], 2), "median_us": round(timings[len(timings) // 2], 2)}
+
+def benchmarks() -> Dict[str, Callable[[], Any]]:
+    analysis = _get_mock_analysis(IDEAS[0])
+    custom_data = analysis.model_dump()
+    ideas = itertools.cycle(IDEAS)
+    text = large_text()
+
+    def cold_readability() -> dict:
+        text_analysis._syllable_cache.clear()
+        return text_analysis.analyze(text, "readability")
+
+    def fastapi_encoding() -> bytes:
+        # What a `response_model` route does with a returned model
+        validated = ProjectAnalyzeResponse.model_validate(analysis.model_dump())
+        return json.dumps(jsonable_encoder(validated)).encode("utf-8")
+
+    return {
+        "mock_analysis": lambda: _get_mock_analysis(next(ideas)),
+        "prompt_from_custom_data": lambda: _generate_prompt_from_custom_data(IDEAS[1], custom_data),
+        "serialize_response_model": fastapi_encoding,
+        "serialize_model_dump_json": lambda: analysis.model_dump_json().encode("utf-8"),
+        "serialize_json_response": lambda: json_response(analysis.model_dump()).body,
+        "readability_1mb": lambda: text_analysis.analyze(text, "readability"),
+        "readability_1mb_cold": cold_readability,
+        "keywords_1mb": lambda: text_analysis.analyze(text, "keywords"),
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--only", default="", help="comma-separated subset of benchmarks")
+    args = parser.parse_args()
+
+    selected = [name for name in args.only.split(",") if name]
+    results: List[Dict[str, Any]] = []
+    for name, fn in benchmarks().items():
+        if selected and name not in selected:
+            continue
+        result = {"benchmark": name, **measure(fn)}
+        results.append(result)
+        print(f"{name:28} best {result['best_us']:10.2f} us  median {result['median_us']:10.2f} us")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"results": results}, f, indent=2)
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Per-row cost of encoding idea listings
+
+Compares the previous path (dicts with isoformat timestamps, validated
+against the response model, re-encoded by FastAPI and dumped with the
+stdlib encoder) with `json_response` (dicts encoded directly by orjson).
+
+Run from backend/: python -m benchmarks.serialization [rows]
+"""
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from pydantic import TypeAdapter
+from app.api.v1.endpoints.ideas import IdeaResponse, _idea_dict
+from app.core.database import Idea, Comment
+from app.core.responses import json_response
+
+def make_rows(count: int):
+    now = datetime.utcnow()
+    rows = []
+    for i in range(count):
+        idea = Idea(
+            id=str(uuid.uuid4()), title=f"Idea {i}", description="A fairly long description. " * 20,
+            category="web", tags=["python", "fastapi", "react"], user_session="bench",
+            created_at=now - timedelta(seconds=i), updated_at=now
+        )
+        comments = [
+            Comment(id=str(uuid.uuid4()), idea_id=idea.id, content=f"Comment {j}", user_session="bench", created_at=now)
+            for j in range(3)
+        ]
+        rows.append((idea, comments))
+    return rows
+
+def previous_path(rows, adapter) -> bytes:
+    content = []
+    for idea, comments in rows:
+        item = _idea_dict(idea, comments, len(comments))
+        item["created_at"] = item["created_at"].isoformat()
+        item["updated_at"] = item["updated_at"].isoformat()
+        for comment in item["comments"]:
+            comment["created_at"] = comment["created_at"].isoformat()
+        content.append(item)
+    validated = adapter.validate_python(content)
+    return json.dumps(adapter.dump_python(validated, mode="json")).encode("utf-8")
+
+def current_path(rows) -> bytes:
+    return json_response([_idea_dict(idea, comments, len(comments)) for idea, comments in rows]).body
+
+def measure(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def main(count: int) -> None:
+    rows = make_rows(count)
+    adapter = TypeAdapter(List[IdeaResponse])
+    assert json.loads(previous_path(rows, adapter)) == json.loads(current_path(rows))
+
+    before = measure(lambda: previous_path(rows, adapter))
+    after = measure(lambda: current_path(rows))
+    print(f"rows: {count}")
+    print(f"validate + stdlib json: {before / count * 1e6:8.2f} us/row")
+    print(f"orjson direct:          {after / count * 1e6:8.2f} us/row")
+    print(f"speedup:                {before / after:8.2f}x")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,88 @@
+"""Calibration of the similarity index used to reuse project analyses
+
+Each pair indexes the first idea, with the technologies an analysis of it
+would list, and looks up the second. Paraphrases must reuse the analysis;
+contrasts (another stack, platform or product) must not. Prints every
+score, the range of thresholds that separates the two sets by embedding
+score alone, and exits non-zero if any pair is decided wrongly at the
+configured SIMILARITY_THRESHOLD.
+
+Run from backend/: python -m benchmarks.similarity [--threshold 0.8]
+"""
+import argparse
+import asyncio
+import os
+import sys
+from typing import Any, Dict, List, Tuple
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app.core.config import settings
+from app.services.similarity import SimilarityIndex
+
+# (indexed idea, its detected stack, submitted idea)
+PARAPHRASES: List[Tuple[str, List[str], str]] = [
+    ("todo app with react", ["React"], "React to-do list"),
+    ("mobile app for fitness tracking", ["React Native", "Firebase"], "fitness tracking mobile app"),
+    ("recipe sharing social network", ["React", "Node.js"], "social network for recipe sharing"),
+    ("e-commerce store with Next.js and Stripe", ["Next.js", "Stripe"], "Next.js e-commerce store using Stripe"),
+    ("chat application using websockets", ["Node.js", "Socket.IO"], "websocket based chat app"),
+    ("personal finance tracker with budgets", ["React", "PostgreSQL"], "budget tracking app for personal finances"),
+    ("blog platform with markdown support", ["Next.js", "MDX"], "markdown blogging platform"),
+    ("weather dashboard in vue", ["Vue.js"], "Vue weather dashboard"),
+    ("Kanban board for teams with drag and drop", ["React"], "drag-and-drop kanban board for teams"),
+    ("URL shortener with analytics", ["Node.js", "Redis"], "URL shortening service with analytics"),
+]
+
+CONTRASTS: List[Tuple[str, List[str], str]] = [
+    ("todo app with react", ["React"], "todo app with vue"),
+    ("todo app with react", ["React"], "React weather dashboard"),
+    ("mobile app for fitness tracking", ["React Native"], "web dashboard for fitness tracking"),
+    ("recipe sharing social network", ["React"], "recipe sharing mobile app"),
+    ("e-commerce store with Next.js and Stripe", ["Next.js", "Stripe"], "e-commerce store with Next.js and PayPal"),
+    ("chat app with websockets in python", ["Python", "FastAPI"], "chat app with websockets in node"),
+    ("personal finance tracker", ["React"], "personal fitness tracker"),
+    ("blog with markdown", ["Next.js"], "blog with wordpress"),
+    ("kanban board for teams", ["React"], "kanban board for personal use"),
+    ("React Native fitness tracker with Firebase", ["React Native", "Firebase"], "React Native fitness tracker with Supabase"),
+    ("url shortener", ["Node.js"], "image hosting service"),
+]
+
+def _analysis(stack: List[str]) -> Dict[str, Any]:
+    return {"detectedStack": {"frontend": stack}}
+
+async def evaluate(pairs: List[Tuple[str, List[str], str]], threshold: float) -> List[Tuple[float, bool]]:
+    """Embedding score and whether the analysis was reused, per pair"""
+    results = []
+    for indexed, stack, submitted in pairs:
+        index = SimilarityIndex()
+        index.enabled = index.loaded = True
+        index.threshold = threshold
+        index.add(indexed, _analysis(stack))
+        score = float(index.embedder.embed(indexed) @ index.embedder.embed(submitted))
+        results.append((score, await index.find(submitted) is not None))
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threshold", type=float, default=settings.SIMILARITY_THRESHOLD)
+    args = parser.parse_args()
+
+    failures = 0
+    scores = {}
+    for label, pairs, expected in (("paraphrase", PARAPHRASES, True), ("contrast", CONTRASTS, False)):
+        results = asyncio.run(evaluate(pairs, args.threshold))
+        scores[label] = [score for score, _ in results]
+        for (indexed, _, submitted), (score, reused) in zip(pairs, results):
+            ok = reused == expected
+            failures += not ok
+            print(f"{'ok  ' if ok else 'FAIL'} {label:10} {score:.3f} {'reused' if reused else 'new   '}  {indexed!r} -> {submitted!r}")
+
+    low, high = max(scores["contrast"]), min(scores["paraphrase"])
+    print(f"\nThreshold {args.threshold:.2f}; scores alone separate the sets for thresholds in ({low:.3f}, {high:.3f}]")
+    if failures:
+        print(f"{failures} pair(s) decided wrongly")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()